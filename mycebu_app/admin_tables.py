@@ -0,0 +1,130 @@
+"""
+Table definitions for the admin dashboard's JSON APIs.
+
+Each dashboard tab loads its rows from /api/admin/<table>/ when it is opened,
+one keyset page at a time. A table names the only columns it sends, the
+columns `q` searches, the query parameters it filters on and the sorts it
+offers; anything else in the request is ignored.
+"""
+from collections import namedtuple
+
+from django.db.models import Q
+
+from accounts.models import User as DbUser
+
+from .models import Complaint, Official, Ordinance, Service, ServiceApplication
+from .pagination import Key, keyset_page
+
+ADMIN_PAGE_SIZE = 25
+ADMIN_MAX_PAGE_SIZE = 100
+
+NEWEST = [Key("created_at", descending=True), Key("id", descending=True)]
+OLDEST = [Key("created_at"), Key("id")]
+
+# fields: the projection sent to the dashboard (and nothing else is read)
+# search: columns matched case-insensitively by ?q=
+# filters: query parameter -> column, exact match
+# sorts: ?sort= value -> keyset ordering; the first one is the default
+AdminTable = namedtuple("AdminTable", ["model", "fields", "search", "filters", "sorts"])
+
+ADMIN_TABLES = {
+    "users": AdminTable(
+        model=DbUser,
+        fields=["id", "first_name", "last_name", "email", "contact_number", "role", "created_at"],
+        search=["first_name", "last_name", "email", "contact_number"],
+        filters={"role": "role"},
+        sorts={
+            "newest": NEWEST,
+            "oldest": OLDEST,
+            "name": [Key("first_name"), Key("last_name"), Key("id")],
+        },
+    ),
+    "permits": AdminTable(
+        model=ServiceApplication,
+        fields=["id", "reference_number", "service_type", "document_status", "document_url", "admin_notes", "created_at"],
+        search=["reference_number", "service_type"],
+        filters={"status": "document_status", "service": "service_type"},
+        sorts={"newest": NEWEST, "oldest": OLDEST},
+    ),
+    "complaints": AdminTable(
+        model=Complaint,
+        fields=["id", "created_at", "is_anonymous", "name", "email", "phone",
+                "category", "subject", "location", "description", "status"],
+        search=["subject", "location", "name", "category"],
+        filters={"status": "status", "category": "category"},
+        sorts={
+            "newest": NEWEST,
+            "oldest": OLDEST,
+            "updated": [Key("updated_at", descending=True), Key("id", descending=True)],
+        },
+    ),
+    "services": AdminTable(
+        model=Service,
+        fields=["id", "service_id", "title", "description"],
+        search=["title", "service_id", "description"],
+        filters={},
+        sorts={"title": [Key("title"), Key("id")], "newest": NEWEST},
+    ),
+    "ordinances": AdminTable(
+        model=Ordinance,
+        fields=["id", "ordinance_number", "name_or_ordinance", "author", "category", "created_at"],
+        search=["name_or_ordinance", "ordinance_number", "author"],
+        filters={"category": "category"},
+        sorts={
+            "newest": NEWEST,
+            "title": [Key("name_or_ordinance"), Key("id")],
+            "number": [Key("ordinance_number"), Key("id")],
+        },
+    ),
+    "officials": AdminTable(
+        model=Official,
+        fields=["id", "name", "position", "office", "district", "phone", "email", "photo"],
+        search=["name", "position", "office"],
+        filters={"district": "district"},
+        sorts={"name": [Key("name"), Key("id")], "newest": NEWEST},
+    ),
+}
+
+
+def admin_table_page(table, params):
+    """
+    One page of an ADMIN_TABLES table for the query parameters `params`
+    (q, sort, cursor, limit and the table's filters). Raises KeyError for an
+    unknown table.
+    """
+    spec = ADMIN_TABLES[table]
+    qs = spec.model.objects.only(*spec.fields)
+
+    query = (params.get("q") or "").strip()
+    if query and spec.search:
+        match = Q()
+        for field in spec.search:
+            match |= Q(**{f"{field}__icontains": query})
+        qs = qs.filter(match)
+
+    for param, field in spec.filters.items():
+        value = (params.get(param) or "").strip()
+        if value:
+            qs = qs.filter(**{field: value})
+
+    sort = params.get("sort")
+    if sort not in spec.sorts:
+        sort = next(iter(spec.sorts))
+
+    try:
+        limit = int(params.get("limit") or ADMIN_PAGE_SIZE)
+    except ValueError:
+        limit = ADMIN_PAGE_SIZE
+    limit = max(1, min(limit, ADMIN_MAX_PAGE_SIZE))
+
+    page = keyset_page(qs, spec.sorts[sort], params.get("cursor"), per_page=limit, fields=spec.fields)
+    return {
+        "items": page.items,
+        "sort": sort,
+        "page": page.number,
+        "num_pages": page.num_pages,
+        "total": page.total,
+        "total_is_estimate": page.total_is_estimate,
+        "next_cursor": page.next_cursor,
+        "prev_cursor": page.prev_cursor,
+    }
@@ -0,0 +1,144 @@
+"""
+Complaint analytics from precomputed daily rollups.
+
+Reports read complaint_daily_rollups (ComplaintRollup), never complaints: one
+row per day, category, subcategory, location and status, kept current by
+triggers (migration 0020). A year-long city-wide trend sums a few thousand
+small rows however many complaints there are. rebuild_rollups() recomputes
+them from complaints for the backfill_complaint_rollups command.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import ComplaintRollup
+
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 731
+ANALYTICS_MAX_ROWS = 1000
+
+# ?group= value -> rollup expression; time groups sort first, in date order
+ANALYTICS_GROUPS = {
+    "day": F("day"),
+    "week": TruncWeek("day"),
+    "month": TruncMonth("day"),
+    "category": F("category"),
+    "subcategory": F("subcategory"),
+    "location": F("location"),
+    "status": F("status"),
+}
+TIME_GROUPS = ("day", "week", "month")
+
+
+class AnalyticsError(ValueError):
+    pass
+
+
+def normalize_location(value):
+    """
+    The Python twin of normalize_complaint_location() in migration 0020. On
+    SQLite it is that function: signals.py registers it on every connection.
+    """
+    return " ".join((value or "").split()).lower()
+
+
+def _day(value, name):
+    day = parse_date(value)
+    if day is None:
+        raise AnalyticsError(f"Invalid {name}: {value!r} (expected YYYY-MM-DD)")
+    return day
+
+
+def _values(params, name):
+    return [v.strip() for v in (params.get(name) or "").split(",") if v.strip()]
+
+
+def complaint_analytics(params):
+    """
+    Complaint counts for the query params: from / to (inclusive days, default
+    the last ANALYTICS_DEFAULT_DAYS), group (comma-separated ANALYTICS_GROUPS,
+    default day) and filters category, subcategory, status (comma-separated)
+    and location. Raises AnalyticsError for bad parameters.
+    """
+    today = timezone.now().astimezone(dt_timezone.utc).date()
+    end = _day(params["to"], "to") if params.get("to") else today
+    start = _day(params["from"], "from") if params.get("from") else end - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if start > end:
+        raise AnalyticsError("from is after to")
+    if (end - start).days >= ANALYTICS_MAX_DAYS:
+        raise AnalyticsError(f"At most {ANALYTICS_MAX_DAYS} days per request")
+
+    groups = _values(params, "group") or ["day"]
+    unknown = [g for g in groups if g not in ANALYTICS_GROUPS]
+    if unknown:
+        raise AnalyticsError(f"Unknown group: {', '.join(unknown)}")
+    groups = list(dict.fromkeys(groups))
+
+    qs = ComplaintRollup.objects.filter(day__range=(start, end), count__gt=0)
+    for name in ("category", "subcategory", "status"):
+        values = _values(params, name)
+        if values:
+            qs = qs.filter(**{f"{name}__in": values})
+    if params.get("location"):
+        qs = qs.filter(location=normalize_location(params["location"]))
+
+    total = qs.aggregate(total=Sum("count"))["total"] or 0
+    keys = {f"g_{g}": ANALYTICS_GROUPS[g] for g in groups}
+    ordering = [f"g_{g}" for g in groups if g in TIME_GROUPS] + ["-count"]
+    rows = (
+        qs.annotate(**keys).values(*keys).annotate(count=Sum("count"))
+        .order_by(*ordering)[:ANALYTICS_MAX_ROWS + 1]
+    )
+    rows = [{**{g: row[f"g_{g}"] for g in groups}, "count": row["count"]} for row in rows]
+    return {
+        "from": start,
+        "to": end,
+        "group": groups,
+        "total": total,
+        "rows": rows[:ANALYTICS_MAX_ROWS],
+        "truncated": len(rows) > ANALYTICS_MAX_ROWS,
+    }
+
+
+_REBUILD_SQL = {
+    "postgresql": """
+        INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, category, coalesce(subcategory, ''),
+               normalize_complaint_location(location), status, count(*)
+        FROM complaints WHERE created_at >= %s
+        GROUP BY 1, 2, 3, 4, 5
+    """,
+    "sqlite": """
+        INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+        SELECT date(created_at), category, coalesce(subcategory, ''),
+               normalize_complaint_location(location), status, count(*)
+        FROM complaints WHERE created_at >= %s
+        GROUP BY 1, 2, 3, 4, 5
+    """,
+}
+
+
+def rebuild_rollups(since=None):
+    """
+    Recomputes the rollups for every day from `since` (a date; default all
+    days) with one INSERT ... SELECT. Writes to complaints wait until it
+    commits so the triggers can't count a row twice. Returns the number of
+    rollup rows written.
+    """
+    if connection.vendor not in _REBUILD_SQL:
+        raise AnalyticsError(f"Rollups aren't supported on {connection.vendor}")
+    start = datetime.combine(since, time.min, tzinfo=dt_timezone.utc) if since else datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("LOCK TABLE complaints IN SHARE MODE")
+            stale = ComplaintRollup.objects.all()
+            if since:
+                stale = stale.filter(day__gte=since)
+            stale.delete()
+            cursor.execute(_REBUILD_SQL[connection.vendor], [connection.ops.adapt_datetimefield_value(start)])
+            return cursor.rowcount
@@ -0,0 +1,113 @@
+"""
+Avatar helpers: normalized thumbnails for uploaded photos and locally
+rendered initials avatars (no third-party avatar service).
+"""
+import hashlib
+import re
+from functools import lru_cache
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.core.files.base import ContentFile
+from django.templatetags.static import static
+from django.urls import reverse
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is required for uploads, not for initials avatars
+    Image = None
+    ImageOps = None
+
+# Square sizes stored per upload: 96 covers the 36-48px header avatars at 2x,
+# 256 covers the 120px profile picture at 2x.
+AVATAR_SIZES = (96, 256)
+AVATAR_THUMB_SIZE = 96
+AVATAR_MAIN_SIZE = 256
+
+# Refuse absurd images before decoding them (roughly a 48 MP photo).
+AVATAR_MAX_PIXELS = 48_000_000
+
+_PALETTE = ["#0d9488", "#2563eb", "#7c3aed", "#db2777", "#ea580c", "#65a30d", "#0891b2", "#4f46e5"]
+_SIZE_SUFFIX = re.compile(r"_(\d+)(\.\w+)?$")
+
+
+def normalize_avatar(file_obj):
+    """
+    Center-crops an uploaded image to a square and re-encodes it as WebP at
+    every AVATAR_SIZES size. Returns ContentFiles in the same order.
+    Raises ValueError for anything that isn't a readable image.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to process avatars (pip install Pillow)")
+
+    try:
+        img = Image.open(file_obj)
+        if img.width * img.height > AVATAR_MAX_PIXELS:
+            raise ValueError("Image is too large")
+        img = ImageOps.exif_transpose(img)
+        img.load()
+    except ValueError:
+        raise
+    except Exception:
+        raise ValueError("Please upload a valid image file")
+
+    img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+    thumbs = []
+    for size in AVATAR_SIZES:
+        square = ImageOps.fit(img, (size, size), Image.LANCZOS)
+        buf = BytesIO()
+        square.save(buf, format="WEBP", quality=82, method=6)
+        thumbs.append(ContentFile(buf.getvalue(), name=f"avatar_{size}.webp"))
+    return thumbs
+
+
+def avatar_public_ids(token):
+    """Cloudinary public_ids for one upload; sizes share a token and differ by suffix."""
+    return [f"avatar_{token}_{size}" for size in AVATAR_SIZES]
+
+
+def avatar_variant_url(url, size):
+    """
+    URL of another stored size of a normalized avatar. Legacy avatars (uploaded
+    before normalization) and initials avatars are returned unchanged.
+    """
+    if not url or "/avatar_" not in url:
+        return url
+    return _SIZE_SUFFIX.sub(lambda m: f"_{size}{m.group(2) or ''}", url)
+
+
+# ==========================================
+# INITIALS AVATARS
+# ==========================================
+
+def initials_for(first_name, last_name, fallback=""):
+    parts = [p for p in (first_name, last_name) if p and p.strip()]
+    if not parts:
+        parts = (fallback or "").split()
+    letters = "".join(p.strip()[0] for p in parts if p.strip() and p.strip()[0].isalnum())
+    return letters[:2].upper()
+
+
+def valid_initials(initials):
+    return bool(re.fullmatch(r"[^\W_]{1,2}", initials or ""))
+
+
+def initials_avatar_url(initials):
+    if not valid_initials(initials):
+        return static("mycebu_app/icons/blank.png")
+    return reverse("avatar_initials", kwargs={"initials": initials})
+
+
+@lru_cache(maxsize=2048)
+def initials_svg(initials):
+    """SVG bytes for an initials avatar. The colour comes from the initials, so the URL fully determines the content."""
+    color = _PALETTE[int(hashlib.md5(initials.encode("utf-8")).hexdigest(), 16) % len(_PALETTE)]
+    svg = (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="128" height="128" viewBox="0 0 128 128">'
+        f'<rect width="128" height="128" fill="{color}"/>'
+        '<text x="50%" y="50%" dy=".35em" text-anchor="middle" fill="#fff" '
+        'font-family="Poppins, Arial, sans-serif" font-size="52" font-weight="600">'
+        f'{escape(initials)}</text></svg>'
+    )
+    return svg.encode("utf-8")
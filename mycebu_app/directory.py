@@ -0,0 +1,232 @@
+"""
+Query helpers for the directory tab: database-side official search, a
+cached facet list (distinct positions and districts with counts) and the
+pre-encoded snapshot served by /api/directory/.
+
+Both caches are keyed on the "directory" data version, which database
+triggers bump in the same transaction as every write to the directory tables
+(migration 0023). A worker reads the version (one primary-key lookup) and
+uses only entries cached under it, so a change shows up everywhere as soon
+as it commits, including bulk and raw SQL writes, and nothing needs
+invalidating.
+"""
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, TextField, Value
+from django.db.models.functions import Concat, Lower
+
+from .models import DataVersion, Official, Department, EmergencyContact
+from .responsive_images import manifest_stamp, responsive_sources
+
+try:
+    import brotli
+except ImportError:  # optional: without it the snapshot is served as gzip/identity only
+    brotli = None
+
+DIRECTORY_VERSION_NAME = "directory"
+# Entries for older versions are never read again, so they only need to outlive slow workers.
+DIRECTORY_CACHE_TTL = 60 * 60 * 24
+
+
+def directory_version():
+    """The committed version of the directory tables (0 before their first write)."""
+    return DataVersion.objects.filter(name=DIRECTORY_VERSION_NAME).values_list("version", flat=True).first() or 0
+
+
+def search_officials(q="", position="all", district="all"):
+    """
+    Officials matching the directory filters, filtered in SQL.
+    `q` matches anywhere in "<name> <position>", case-insensitively, like the old Python loop.
+    """
+    qs = Official.objects.all().order_by('name')
+    if q:
+        qs = qs.annotate(
+            _name_pos=Lower(Concat('name', Value(' '), 'position', output_field=TextField()))
+        ).filter(_name_pos__contains=q.lower())
+    if position and position != "all":
+        qs = qs.filter(position=position)
+    if district and district != "all":
+        qs = qs.filter(district=district)
+    return qs
+
+
+def _build_directory_facets():
+    positions = (
+        Official.objects.values('position')
+        .annotate(count=Count('id'))
+        .order_by('position')
+    )
+    districts = (
+        Official.objects.exclude(district__isnull=True).exclude(district="")
+        .values('district')
+        .annotate(count=Count('id'))
+        .order_by('district')
+    )
+    return {
+        "positions": [{"value": p['position'], "count": p['count']} for p in positions],
+        "districts": [{"value": d['district'], "count": d['count']} for d in districts],
+    }
+
+
+def directory_facets():
+    """{"positions": [{"value", "count"}], "districts": [...]}, sorted by value."""
+    key = f"directory:facets:{directory_version()}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = _build_directory_facets()
+        cache.set(key, facets, DIRECTORY_CACHE_TTL)
+    return facets
+
+
+# ==========================================
+# API SNAPSHOT
+# ==========================================
+# The /api/directory/ response is encoded once per version (JSON, gzip and,
+# when available, brotli) and each worker keeps the bytes in memory; requests
+# only read the version and copy bytes out.
+
+# Preferred first.
+SNAPSHOT_ENCODINGS = ["br", "gzip", "identity"]
+
+_local_snapshot = {}
+
+
+def _official_photo_srcset(photo):
+    """AVIF/WebP srcsets for bundled portraits ({} for remote photos or before variants are built)."""
+    if not photo or photo.startswith("http"):
+        return {}
+    return responsive_sources(f"mycebu_app/images/directory-profiles/{photo}")["srcset"]
+
+
+def build_directory_payload():
+    """The full directory API response as a dict: officials, offices, hotlines and filter values."""
+    officials_data = []
+    positions = set()
+    districts = set()
+
+    for o in Official.objects.all().order_by('name'):
+        # Handle potential None values safely
+        pos = o.position or "Official"
+        dist = o.district or ""
+
+        if pos: positions.add(pos)
+        if dist: districts.add(dist)
+
+        officials_data.append({
+            "id": str(o.id),
+            "name": o.name or "Unknown Name",
+            "position": pos,
+            "office": o.office or "",
+            "district": dist,
+            # IMPORTANT: Return empty string if no photo, never None
+            "photo": o.photo if o.photo else None,
+            "photo_srcset": _official_photo_srcset(o.photo),
+            "initials": o.initials or (o.name[:2].upper() if o.name else "??"),
+            "email": o.email or None,
+            "phone": o.phone or None
+        })
+
+    dept_data = []
+    for d in Department.objects.all().order_by('name'):
+        # Ensure contact_details is a dictionary
+        contacts = d.contact_details if isinstance(d.contact_details, dict) else {}
+        dept_data.append({
+            "id": str(d.id),
+            "name": d.name or "Unnamed Office",
+            "head": d.head or "",
+            "emails": contacts.get('emails', []) if contacts else [],
+            "phones": contacts.get('phones', []) if contacts else []
+        })
+
+    hotline_data = []
+    for h in EmergencyContact.objects.all().order_by('service'):
+        # Ensure numbers is a list
+        nums = h.numbers if isinstance(h.numbers, list) else [h.numbers] if h.numbers else []
+        hotline_data.append({
+            "id": str(h.id),
+            "service": h.service or "Service",
+            "numbers": nums
+        })
+
+    return {
+        "success": True,
+        "officials": officials_data,
+        "offices": dept_data,
+        "hotlines": hotline_data,
+        "filters": {
+            "positions": sorted(positions),
+            "districts": sorted(districts)
+        }
+    }
+
+
+def _encode_snapshot(version):
+    body = json.dumps(build_directory_payload(), separators=(",", ":")).encode("utf-8")
+    bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body, quality=11)
+    return {
+        "version": version,
+        "etag": hashlib.sha1(body).hexdigest()[:16],
+        "bodies": bodies,
+    }
+
+
+def _snapshot_version():
+    # Rebuilt portrait variants change photo_srcset without touching the tables.
+    return f"{directory_version()}:{manifest_stamp()}"
+
+
+def get_directory_snapshot():
+    """
+    {"version", "etag", "bodies": {encoding: bytes}} for the current data.
+    Reuses this worker's copy while the version is unchanged, then the shared
+    cache's, and only encodes from the database when neither has it.
+    """
+    version = _snapshot_version()
+    snapshot = _local_snapshot.get("current")
+    if snapshot and snapshot["version"] == version:
+        return snapshot
+
+    key = f"directory:snapshot:{version}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _encode_snapshot(version)
+        cache.set(key, snapshot, DIRECTORY_CACHE_TTL)
+    _local_snapshot["current"] = snapshot
+    return snapshot
+
+
+def negotiate_encoding(accept_encoding, available):
+    """
+    Best of `available` (br > gzip > identity) allowed by an Accept-Encoding
+    header. Identity is always acceptable unless explicitly refused.
+    """
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    default = accepted.get("*", None)
+    for encoding in SNAPSHOT_ENCODINGS:
+        if encoding not in available:
+            continue
+        q = accepted.get(encoding, default)
+        if encoding == "identity" and q is None:
+            q = 1.0
+        if q:
+            return encoding
+    return "identity"
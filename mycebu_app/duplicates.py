@@ -0,0 +1,151 @@
+"""
+Near-duplicate complaints by MinHash locality-sensitive hashing.
+
+Each complaint's subject, location and description are cut into character
+shingles and summarised by a MinHash signature: SIGNATURE_SIZE minimums of
+the shingle hashes under as many hash functions, where the share of equal
+positions between two signatures estimates the Jaccard similarity of their
+shingle sets. The signature is split into LSH_BANDS bands of LSH_ROWS
+values and each band is hashed to one bucket key (complaint_lsh_buckets), so
+complaints that agree on any whole band share a key.
+
+Finding the complaints similar to one is then a single indexed lookup of its
+LSH_BANDS keys plus a comparison with the few signatures found there, never a
+scan of all complaints. With 20 bands of 3 rows a pair at similarity 0.5 is
+found 93% of the time, at 0.3 about 42% and at 0.1 about 2%.
+"""
+import hashlib
+import re
+import struct
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Complaint, ComplaintBucket, ComplaintSignature
+
+SHINGLE_SIZE = 5
+LSH_BANDS = 20
+LSH_ROWS = 3
+SIGNATURE_SIZE = LSH_BANDS * LSH_ROWS
+
+# Estimated similarity below which a candidate isn't reported
+SIMILAR_MIN_SCORE = 0.3
+SIMILAR_LIMIT = 20
+# Candidates (most shared bands first) whose signatures are compared
+SIMILAR_MAX_CANDIDATES = 200
+
+_PRIME = (1 << 61) - 1
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+# h_i(x) = (a_i * x + b_i) mod 2^61 - 1. Derived from fixed strings, not a
+# random generator, so stored signatures stay comparable across releases.
+_PERMUTATIONS = [
+    (_hash64(f"minhash-a-{i}".encode()) % (_PRIME - 1) + 1, _hash64(f"minhash-b-{i}".encode()) % _PRIME)
+    for i in range(SIGNATURE_SIZE)
+]
+
+
+def complaint_text(subject, location, description):
+    """Lowercased words of the fields that identify an incident, joined by single spaces."""
+    text = " ".join(part or "" for part in (subject, location, description))
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def shingles(text):
+    """The set of SHINGLE_SIZE-character substrings of `text` (the text itself if shorter)."""
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """The MinHash signature of `text` as SIGNATURE_SIZE ints below 2^61."""
+    hashes = [_hash64(s.encode()) % _PRIME for s in shingles(text)]
+    if not hashes:
+        return [_PRIME] * SIGNATURE_SIZE
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per band; the band number is hashed in so bands never collide."""
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f">H{LSH_ROWS}Q", band, *rows), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def pack_signature(signature):
+    return struct.pack(f">{SIGNATURE_SIZE}Q", *signature)
+
+
+def unpack_signature(data):
+    return list(struct.unpack(f">{SIGNATURE_SIZE}Q", bytes(data)))
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+def complaint_signature(complaint):
+    return minhash(complaint_text(complaint.subject, complaint.location, complaint.description))
+
+
+def index_complaints(complaints):
+    """
+    Stores the signatures and bucket keys of `complaints` (objects with id,
+    subject, location and description), replacing any earlier ones. Four
+    statements per call however many complaints are passed.
+    """
+    signatures, buckets = [], []
+    for complaint in complaints:
+        signature = complaint_signature(complaint)
+        signatures.append(ComplaintSignature(complaint_id=complaint.id, minhash=pack_signature(signature)))
+        buckets.extend(ComplaintBucket(complaint_id=complaint.id, key=key) for key in band_keys(signature))
+    if not signatures:
+        return 0
+    ids = [s.complaint_id for s in signatures]
+    with transaction.atomic():
+        ComplaintBucket.objects.filter(complaint_id__in=ids).delete()
+        ComplaintSignature.objects.filter(complaint_id__in=ids).delete()
+        ComplaintSignature.objects.bulk_create(signatures)
+        ComplaintBucket.objects.bulk_create(buckets)
+    return len(signatures)
+
+
+def index_complaint(complaint):
+    index_complaints([complaint])
+
+
+def find_similar(complaint_id, limit=SIMILAR_LIMIT, min_score=SIMILAR_MIN_SCORE):
+    """
+    [(complaint_id, score)] for complaints that share an LSH bucket with
+    `complaint_id` and whose estimated similarity is at least `min_score`,
+    best first. A complaint not indexed yet is indexed on the way.
+    """
+    stored = ComplaintSignature.objects.filter(complaint_id=complaint_id).values_list("minhash", flat=True).first()
+    if stored is None:
+        complaint = Complaint.objects.only("id", "subject", "location", "description").get(pk=complaint_id)
+        index_complaint(complaint)
+        signature = complaint_signature(complaint)
+    else:
+        signature = unpack_signature(stored)
+
+    candidates = (
+        ComplaintBucket.objects.filter(key__in=band_keys(signature))
+        .exclude(complaint_id=complaint_id)
+        .values("complaint_id").annotate(bands=Count("id")).order_by("-bands")
+        .values_list("complaint_id", flat=True)[:SIMILAR_MAX_CANDIDATES]
+    )
+    found = ComplaintSignature.objects.filter(complaint_id__in=list(candidates)).values_list("complaint_id", "minhash")
+    scored = [(pk, similarity(signature, unpack_signature(data))) for pk, data in found]
+    scored = [(pk, score) for pk, score in scored if score >= min_score]
+    scored.sort(key=lambda item: -item[1])
+    return scored[:limit]
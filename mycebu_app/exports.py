@@ -0,0 +1,117 @@
+"""
+Streaming CSV / NDJSON exports of admin data.
+
+Rows are read with .values_list(...).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+(a server-side cursor on Postgres) and encoded one at a time into a
+StreamingHttpResponse, so memory use doesn't grow with the table.
+"""
+import csv
+from collections import namedtuple
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from accounts.models import User as DbUser
+
+from .models import Complaint, ServiceApplication
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# columns: the projection, in output order
+# status: column filtered by ?status= (None if the table has no status)
+Export = namedtuple("Export", ["model", "columns", "status"])
+
+EXPORTS = {
+    "complaints": Export(
+        model=Complaint,
+        columns=["id", "created_at", "updated_at", "status", "category", "subcategory", "subject",
+                 "location", "description", "is_anonymous", "name", "email", "phone", "user_id"],
+        status="status",
+    ),
+    "permits": Export(
+        model=ServiceApplication,
+        columns=["id", "created_at", "updated_at", "completed_at", "reference_number", "service_type",
+                 "document_status", "document_url", "progress", "step_index", "admin_notes", "user_id"],
+        status="document_status",
+    ),
+    "users": Export(
+        model=DbUser,
+        columns=["id", "created_at", "email", "first_name", "middle_name", "last_name",
+                 "contact_number", "role", "city", "purok"],
+        status=None,
+    ),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _day_bound(value, end):
+    day = parse_date(value)
+    if day is None:
+        raise ExportError(f"Invalid date: {value!r} (expected YYYY-MM-DD)")
+    moment = datetime.combine(day, time.max if end else time.min)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def export_queryset(table, params):
+    """
+    values_list() of the table's export columns, filtered by the query params
+    `from` / `to` (inclusive YYYY-MM-DD bounds on created_at) and `status`
+    (comma-separated). Raises KeyError for an unknown table, ExportError for
+    bad parameters.
+    """
+    spec = EXPORTS[table]
+    qs = spec.model.objects.all()
+
+    if params.get("from"):
+        qs = qs.filter(created_at__gte=_day_bound(params["from"], end=False))
+    if params.get("to"):
+        qs = qs.filter(created_at__lte=_day_bound(params["to"], end=True))
+
+    statuses = [s.strip() for s in (params.get("status") or "").split(",") if s.strip()]
+    if statuses:
+        if spec.status is None:
+            raise ExportError(f"{table} can't be filtered by status")
+        qs = qs.filter(**{f"{spec.status}__in": statuses})
+
+    return qs.order_by("created_at", "pk").values_list(*spec.columns)
+
+
+class _Echo:
+    """File-like object for csv.writer that hands back each line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_rows(columns, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(columns)  # BOM so Excel reads UTF-8
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value for value in row
+        )
+
+
+def ndjson_rows(columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def export_stream(table, fmt, params):
+    """An iterator of encoded lines for StreamingHttpResponse."""
+    qs = export_queryset(table, params)
+    rows = qs.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    columns = EXPORTS[table].columns
+    return csv_rows(columns, rows) if fmt == "csv" else ndjson_rows(columns, rows)
@@ -0,0 +1,171 @@
+"""
+Complaint and permit changes for the dashboards.
+
+Database triggers (migration 0017) append every change to change_events, a
+log whose ids only increase. A dashboard polls with the last id it has seen
+while it is visible and gets the current state of each row changed since, or
+an empty 204 when nothing changed, so no request waits on the database.
+"""
+from datetime import timedelta
+
+from django.db.models import Max
+from django.utils import timezone
+
+from .admin_tables import ADMIN_TABLES
+from .models import ChangeEvent
+
+# Events read per query
+FEED_BATCH = 200
+# Batches read by one poll; a client further behind is told there's more and polls again at once
+FEED_POLL_BATCHES = 5
+# Ids come from a sequence, so a later id can commit before an earlier one.
+# A gap followed by an event younger than this may still fill in; an older gap
+# is taken to be a rolled-back insert.
+FEED_GAP_GRACE_SECONDS = 10
+
+
+def latest_event_id():
+    return ChangeEvent.objects.aggregate(latest=Max("id"))["latest"] or 0
+
+
+def parse_event_id(value):
+    """A client-supplied cursor (?since=), or None if missing or invalid."""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def has_changes(after, user_id=None):
+    """Whether any change event (of `user_id`'s rows, if given) has an id above `after`. One index probe."""
+    events = ChangeEvent.objects.filter(id__gt=after)
+    if user_id:
+        events = events.filter(user_id=user_id)
+    return events.exists()
+
+
+def _grace_cutoff():
+    return timezone.now() - timedelta(seconds=FEED_GAP_GRACE_SECONDS)
+
+
+def read_changes(after, limit=FEED_BATCH):
+    """
+    (events, cursor, caught_up): change events after id `after` as dicts,
+    the id to resume from, and whether the log has nothing more to give right
+    now. Reading stops at a fresh gap in the ids so an insert that commits
+    late isn't skipped.
+    """
+    grace = _grace_cutoff()
+    rows = list(
+        ChangeEvent.objects.filter(id__gt=after).order_by("id")
+        .values("id", "created_at", "kind", "object_id", "user_id", "action")[:limit]
+    )
+
+    cursor = after
+    accepted = 0
+    for row in rows:
+        if row["id"] != cursor + 1 and row["created_at"] > grace:
+            break
+        cursor = row["id"]
+        accepted += 1
+    caught_up = accepted == len(rows) and len(rows) < limit
+    return rows[:accepted], cursor, caught_up
+
+
+def settled_event_id(after):
+    """
+    The highest id at or above `after` before which no event can still
+    appear: the start of the first fresh gap, else the latest id. Only events
+    younger than FEED_GAP_GRACE_SECONDS are read, however far back `after` is.
+    """
+    fresh = list(
+        ChangeEvent.objects.filter(id__gt=after, created_at__gt=_grace_cutoff())
+        .order_by("id").values_list("id", flat=True)[:FEED_BATCH]
+    )
+    if not fresh:
+        return max(after, latest_event_id())
+    cursor = ChangeEvent.objects.filter(id__gt=after, id__lt=fresh[0]).aggregate(latest=Max("id"))["latest"] or after
+    for event_id in fresh:
+        if event_id != cursor + 1:
+            break
+        cursor = event_id
+    return cursor
+
+
+def read_user_changes(after, user_id, limit=FEED_BATCH):
+    """
+    read_changes() for one user's rows, read from change_events_user_idx up
+    to settled_event_id(), so other users' events are never scanned.
+    """
+    settled = settled_event_id(after)
+    events = list(
+        ChangeEvent.objects.filter(user_id=user_id, id__gt=after, id__lte=settled).order_by("id")
+        .values("id", "kind", "object_id", "user_id", "action")[:limit]
+    )
+    if len(events) == limit:
+        return events, events[-1]["id"], False
+    return events, settled, True
+
+
+def latest_per_object(events):
+    """
+    The last event for each (kind, object_id), in order; earlier ones are
+    superseded, except that a row created in the batch still reads as created.
+    """
+    latest = {}
+    for event in events:
+        key = (event["kind"], event["object_id"])
+        earlier = latest.pop(key, None)
+        if earlier and earlier["action"] == "created" and event["action"] == "updated":
+            event = {**event, "action": "created"}
+        latest[key] = event
+    return list(latest.values())
+
+
+def poll_changes(after, render, user_id=None):
+    """
+    One poll of the log after id `after`: (messages, cursor, more) where
+    `render(events)` turns the changed rows into [(kind, data)] messages,
+    cursor is the id to poll from next and more says the client is still
+    behind and should poll again straight away.
+    """
+    events, cursor, more = [], after, False
+    for _ in range(FEED_POLL_BATCHES):
+        if user_id:
+            batch, next_cursor, caught_up = read_user_changes(cursor, user_id)
+        else:
+            batch, next_cursor, caught_up = read_changes(cursor)
+        events += batch
+        more = next_cursor != cursor and not caught_up
+        cursor = next_cursor
+        if not more:
+            break
+    messages = render(latest_per_object(events)) if events else []
+    return messages, cursor, more
+
+
+# change_events.kind -> the admin table its rows are rendered with
+ADMIN_FEED_TABLES = {"complaint": "complaints", "permit": "permits"}
+
+
+def render_admin_changes(events):
+    """
+    Messages for the admin dashboard: (kind, {"action", "id", "item"}) where
+    item is the row as /api/admin/<table>/ returns it, or None if it is gone.
+    One query per kind.
+    """
+    rows = {}
+    for kind, table in ADMIN_FEED_TABLES.items():
+        ids = [e["object_id"] for e in events if e["kind"] == kind and e["action"] != "deleted"]
+        if ids:
+            spec = ADMIN_TABLES[table]
+            rows[kind] = {row["id"]: row for row in spec.model.objects.filter(pk__in=ids).values(*spec.fields)}
+
+    messages = []
+    for event in events:
+        if event["kind"] not in ADMIN_FEED_TABLES:
+            continue
+        item = rows.get(event["kind"], {}).get(event["object_id"])
+        action = event["action"] if item is not None else "deleted"
+        messages.append((event["kind"], {"action": action, "id": event["object_id"], "item": item}))
+    return messages
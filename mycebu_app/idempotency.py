@@ -0,0 +1,114 @@
+"""
+Idempotency-Key support for submission endpoints.
+
+A client that may retry a POST (flaky mobile connections) sends the same
+Idempotency-Key header with every attempt. The first attempt claims the key
+by inserting an idempotency_keys row (unique per user, URL and key), runs
+the view and stores its response there for IDEMPOTENCY_KEY_TTL seconds.
+Later attempts, on whichever worker they land, get that response back with
+Idempotent-Replayed: true, without the view running again, so nothing is
+uploaded or inserted twice. An attempt that arrives while the first is
+still running gets 409 and should retry shortly. Responses from 500 up
+aren't kept, so the client can retry those with the same key.
+
+Reusing a key for a different request body is answered with 422. Multipart
+bodies (complaint photos and permit documents) are fingerprinted by length
+only: hashing them would mean holding or re-reading whole uploads before the
+view runs, and upload_permit_document streams its file to storage as it is
+parsed. So on both endpoints, reusing a key for a different upload of the
+same size is not detected and replays the first response.
+prune_idempotency_keys deletes expired keys.
+"""
+import hashlib
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_TTL = getattr(settings, "IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+# How long a key stays claimed by an attempt that never finishes (a killed worker)
+IDEMPOTENCY_LOCK_SECONDS = 5 * 60
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def _fingerprint(request):
+    """Identifies the request body; for multipart bodies only their length (see the module docstring)."""
+    if request.content_type == "multipart/form-data":
+        return f"multipart:{request.META.get('CONTENT_LENGTH', '')}"
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def _error(message, status):
+    return JsonResponse({"success": False, "error": message}, status=status)
+
+
+def _claim(request, key, fingerprint):
+    """
+    (row, claimed): the new idempotency_keys row if this attempt got the key,
+    else the row of the attempt that has it (None if that row went away in
+    between).
+    """
+    now = timezone.now()
+    scope = {"user_id": request.user.pk, "path": request.path, "key": key}
+    # A key past its TTL, or held by an attempt that died, is free again
+    IdempotencyKey.objects.filter(**scope).filter(
+        Q(created_at__lt=now - timedelta(seconds=IDEMPOTENCY_KEY_TTL))
+        | Q(status__isnull=True, created_at__lt=now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS))
+    ).delete()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(**scope, fingerprint=fingerprint, created_at=now), True
+    except IntegrityError:
+        return IdempotencyKey.objects.filter(**scope).first(), False
+
+
+def idempotent(view):
+    """Replays the stored response of an earlier request with the same Idempotency-Key (see the module docstring)."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH or not key.isprintable():
+            return _error(f"Invalid {IDEMPOTENCY_HEADER}", 400)
+
+        fingerprint = _fingerprint(request)
+        row, claimed = _claim(request, key, fingerprint)
+        if not claimed:
+            if row is None:
+                # The other attempt failed and released the key just now; tell the client to try again
+                return _error("Request is being processed, retry shortly", 409)
+            if row.fingerprint != fingerprint:
+                return _error(f"{IDEMPOTENCY_HEADER} was already used for a different request", 422)
+            if row.status is None:
+                response = _error("Request is being processed, retry shortly", 409)
+                response["Retry-After"] = "1"
+                return response
+            response = HttpResponse(bytes(row.content or b""), status=row.status, content_type=row.content_type)
+            response["Idempotent-Replayed"] = "true"
+            return response
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            IdempotencyKey.objects.filter(pk=row.pk).delete()
+            raise
+        if response.status_code >= 500 or response.streaming:
+            IdempotencyKey.objects.filter(pk=row.pk).delete()
+        else:
+            IdempotencyKey.objects.filter(pk=row.pk).update(
+                status=response.status_code,
+                content_type=response.get("Content-Type", ""),
+                content=response.content,
+            )
+        return response
+
+    return wrapper
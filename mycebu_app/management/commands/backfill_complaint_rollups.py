@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from mycebu_app.analytics import AnalyticsError, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the complaint analytics rollups from the complaints table: every day, "
+        "or from --since on. Run once after deploying, or after editing complaints "
+        "where the triggers don't fire."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild (YYYY-MM-DD); default all days")
+
+    def handle(self, *args, **opts):
+        since = None
+        if opts["since"]:
+            since = parse_date(opts["since"])
+            if since is None:
+                raise CommandError(f"Invalid --since: {opts['since']!r} (expected YYYY-MM-DD)")
+        try:
+            written = rebuild_rollups(since)
+        except AnalyticsError as e:
+            raise CommandError(str(e))
+        scope = f"from {since}" if since else "for all days"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt complaint rollups {scope} ({written} rows)."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from mycebu_app.duplicates import index_complaints
+from mycebu_app.models import Complaint
+
+
+class Command(BaseCommand):
+    help = (
+        "Computes the MinHash signatures and LSH buckets used to find duplicate "
+        "complaints for every complaint that has none (all of them with --all). "
+        "New complaints are indexed on submit; run this once after deploying."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-index complaints that already have a signature")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        complaints = Complaint.objects.only("id", "subject", "location", "description").order_by("id")
+        if not opts["all"]:
+            complaints = complaints.filter(signature__isnull=True)
+
+        indexed = 0
+        batch = []
+        for complaint in complaints.iterator(chunk_size=opts["batch_size"]):
+            batch.append(complaint)
+            if len(batch) >= opts["batch_size"]:
+                indexed += index_complaints(batch)
+                batch = []
+        indexed += index_complaints(batch)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} complaints for duplicate detection."))
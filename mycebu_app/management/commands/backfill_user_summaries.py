@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from mycebu_app.summaries import rebuild_user_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts every citizen's dashboard counters (user_summaries) from the "
+        "complaints and service_applications tables. Run once after deploying, or "
+        "after editing those tables where the triggers don't fire."
+    )
+
+    def handle(self, *args, **opts):
+        written = rebuild_user_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dashboard counters for {written} users."))
@@ -0,0 +1,83 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mycebu_app.directory import search_officials, directory_facets
+from mycebu_app.models import Official
+
+POSITIONS = ["Councilor", "Barangay Captain", "Barangay Kagawad", "SK Chairperson", "Department Head", "Director"]
+DISTRICTS = ["North District", "South District", ""]
+FIRST = ["Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Carlos", "Elena", "Miguel", "Luz"]
+LAST = ["Rama", "Osmena", "Garcia", "Labella", "Tumulak", "Go", "Ong", "Zafra", "Pepito", "Cruz"]
+
+
+def _legacy_directory(q, position_filter, district_filter):
+    """The pre-optimization directory tab: full scans plus Python filtering."""
+    officials_all = Official.objects.all().order_by('name')
+    positions = sorted(list(set(Official.objects.values_list('position', flat=True))))
+    districts = sorted(list(set(Official.objects.exclude(district__isnull=True).exclude(district="").values_list('district', flat=True))))
+    officials_filtered = []
+    for o in officials_all:
+        name_pos = f"{o.name} {o.position}".lower()
+        if q and q not in name_pos: continue
+        if position_filter != "all" and o.position != position_filter: continue
+        if district_filter != "all" and o.district != district_filter: continue
+        officials_filtered.append(o)
+    return officials_filtered, positions, districts
+
+
+def _optimized_directory(q, position_filter, district_filter):
+    facets = directory_facets()
+    officials = list(search_officials(q, position_filter, district_filter))
+    return officials, [f["value"] for f in facets["positions"]], [f["value"] for f in facets["districts"]]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the directory tab (legacy Python filtering vs. SQL filtering + cached facets) "
+        "against synthetic officials. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--officials", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def _time(self, fn, repeat, *args):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = fn(*args)
+        return (time.perf_counter() - start) / repeat * 1000, result
+
+    def handle(self, *args, **opts):
+        rng = random.Random(42)
+        cases = [
+            ("no filters", "", "all", "all"),
+            ("search 'rama'", "rama", "all", "all"),
+            ("position + district", "", "Councilor", "North District"),
+        ]
+
+        with transaction.atomic():
+            Official.objects.bulk_create([
+                Official(
+                    name=f"{rng.choice(FIRST)} {rng.choice(LAST)} {i}",
+                    position=rng.choice(POSITIONS),
+                    district=rng.choice(DISTRICTS),
+                    office="Synthetic Office",
+                )
+                for i in range(opts["officials"])
+            ], batch_size=1000)
+
+            total = Official.objects.count()
+            self.stdout.write(f"{total} officials, {opts['repeat']} runs per case (ms per request)")
+            for label, q, pos, dist in cases:
+                legacy_ms, legacy = self._time(_legacy_directory, opts["repeat"], q, pos, dist)
+                new_ms, new = self._time(_optimized_directory, opts["repeat"], q, pos, dist)
+                same = [o.id for o in legacy[0]] == [o.id for o in new[0]] and legacy[1:] == new[1:]
+                self.stdout.write(
+                    f"  {label:<22} legacy {legacy_ms:8.1f}   optimized {new_ms:8.1f}   "
+                    f"{legacy_ms / new_ms:5.1f}x   results match: {same}"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+
+from mycebu_app.standin_storage import make_standin_server, start_standin_server
+from mycebu_app.uploads import upload_to_cloudinary, upload_many_to_cloudinary
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks sequential vs. parallel attachment uploads against a local "
+        "stand-in for the Cloudinary API. Use --serve to only run the stand-in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=5, help="Attachments per complaint (default 5)")
+        parser.add_argument("--size-kb", type=int, default=512, help="Size of each attachment in KB")
+        parser.add_argument("--latency", type=float, default=0.25, help="Simulated round trip in seconds")
+        parser.add_argument("--workers", type=int, default=None, help="Override UPLOAD_MAX_WORKERS")
+        parser.add_argument("--serve", action="store_true", help="Only run the stand-in server")
+        parser.add_argument("--port", type=int, default=8765, help="Port for --serve")
+
+    def handle(self, *args, **opts):
+        if opts["serve"]:
+            server = make_standin_server(port=opts["port"], latency=opts["latency"], verbose=True)
+            self.stdout.write(
+                f"Stand-in storage listening. Set CLOUDINARY_UPLOAD_PREFIX=http://127.0.0.1:{opts['port']}"
+            )
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+            return
+
+        server, prefix = start_standin_server(latency=opts["latency"])
+        original = dict(settings.CLOUDINARY_STORAGE)
+        settings.CLOUDINARY_STORAGE.update({
+            "CLOUD_NAME": original.get("CLOUD_NAME") or "standin",
+            "API_KEY": original.get("API_KEY") or "standin",
+            "API_SECRET": original.get("API_SECRET") or "standin",
+            "UPLOAD_PREFIX": prefix,
+        })
+
+        payload = b"\0" * (opts["size_kb"] * 1024)
+
+        def make_files():
+            return [
+                SimpleUploadedFile(f"photo{i}.jpg", payload, content_type="image/jpeg")
+                for i in range(opts["files"])
+            ]
+
+        try:
+            files = make_files()
+            start = time.perf_counter()
+            for f in files:
+                upload_to_cloudinary(f, folder="bench")
+            sequential = time.perf_counter() - start
+
+            files = make_files()
+            start = time.perf_counter()
+            upload_many_to_cloudinary(files, folder="bench", max_workers=opts["workers"])
+            parallel = time.perf_counter() - start
+        finally:
+            settings.CLOUDINARY_STORAGE.clear()
+            settings.CLOUDINARY_STORAGE.update(original)
+            server.shutdown()
+            server.server_close()
+
+        self.stdout.write(f"{opts['files']} x {opts['size_kb']} KB, {opts['latency']*1000:.0f} ms simulated latency")
+        self.stdout.write(f"  sequential: {sequential:.3f}s")
+        self.stdout.write(f"  parallel:   {parallel:.3f}s")
+        self.stdout.write(self.style.SUCCESS(f"  speedup:    {sequential / parallel:.1f}x"))
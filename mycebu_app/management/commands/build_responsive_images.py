@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mycebu_app.responsive_images import build_variants
+
+
+class Command(BaseCommand):
+    help = "Generates resized, content-hashed AVIF/WebP variants of the images in settings.RESPONSIVE_IMAGES."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Re-encode even if a source is unchanged")
+
+    def handle(self, *args, **opts):
+        try:
+            built, skipped = build_variants(force=opts["force"], log=self.stdout.write)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f"Responsive images: {built} built, {skipped} unchanged"))
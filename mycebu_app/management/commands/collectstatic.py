@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.management.commands.collectstatic import Command as CollectStaticCommand
+from django.core.management import call_command
+
+
+class Command(CollectStaticCommand):
+    """collectstatic that builds responsive image variants first so they get collected too."""
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--skip-responsive-images", action="store_true",
+            help="Don't run build_responsive_images before collecting.",
+        )
+
+    def handle(self, **options):
+        if not options.pop("skip_responsive_images", False):
+            call_command("build_responsive_images", verbosity=options.get("verbosity", 1))
+
+            # The output dir only joins STATICFILES_DIRS once it exists; on a first build
+            # it was just created, so register it and drop the cached finders.
+            output_dir = settings.RESPONSIVE_IMAGES["OUTPUT_DIR"]
+            if output_dir not in settings.STATICFILES_DIRS:
+                settings.STATICFILES_DIRS.append(output_dir)
+                finders.get_finder.cache_clear()
+
+        return super().handle(**options)
@@ -0,0 +1,45 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from mycebu_app.models import Ordinance
+from mycebu_app.ordinance_text import download_pdf, index_ordinance_pdf
+
+
+class Command(BaseCommand):
+    help = (
+        "Extracts and indexes the PDF text of ordinances (downloading each PDF). "
+        "By default only ordinances that haven't been indexed yet; uploads from the "
+        "admin dashboard are indexed automatically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", help="Ordinance ids (default: every unindexed ordinance with a PDF)")
+        parser.add_argument("--all", action="store_true", help="Re-index ordinances that are already indexed")
+
+    def handle(self, *args, **opts):
+        qs = Ordinance.objects.exclude(pdf_file_path="").order_by("name_or_ordinance")
+        if opts["ids"]:
+            qs = qs.filter(id__in=opts["ids"])
+        elif not opts["all"]:
+            qs = qs.exclude(text_status="indexed")
+
+        indexed = failed = 0
+        for ordinance_id, number, url in qs.values_list("id", "ordinance_number", "pdf_file_path"):
+            label = number or ordinance_id
+            path = None
+            try:
+                path = download_pdf(url)
+                passages = index_ordinance_pdf(ordinance_id, path)
+                indexed += 1
+                self.stdout.write(f"{label}: {passages} passages")
+            except Exception as e:
+                failed += 1
+                if path is None:
+                    Ordinance.objects.filter(id=ordinance_id).update(text_status="failed")
+                self.stderr.write(f"{label}: {e}")
+            finally:
+                if path:
+                    os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} ordinance(s), {failed} failed."))
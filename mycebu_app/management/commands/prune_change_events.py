@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mycebu_app.models import ChangeEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes live feed change events older than --days (default 7). A browser "
+        "that reconnects after that long just misses the old changes, so this is "
+        "safe to run daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(days=opts["days"])
+        deleted, _ = ChangeEvent.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change events older than {opts['days']} days."))
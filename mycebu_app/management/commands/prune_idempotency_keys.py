@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mycebu_app.idempotency import IDEMPOTENCY_KEY_TTL
+from mycebu_app.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes Idempotency-Key records older than IDEMPOTENCY_KEY_TTL. Expired "
+        "keys are never replayed, so this is safe to run daily from cron."
+    )
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(seconds=IDEMPOTENCY_KEY_TTL)
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
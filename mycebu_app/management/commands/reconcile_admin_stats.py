@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from mycebu_app.stats import reconcile_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the admin dashboard stats (complaints, pending complaints, users, "
+        "pending permits) and corrects any drift in the stored counters. "
+        "Meant to run periodically, e.g. hourly from cron."
+    )
+
+    def handle(self, *args, **opts):
+        drift = reconcile_stats()
+        for name, (stored, actual) in sorted(drift.items()):
+            was = "missing" if stored is None else stored
+            self.stdout.write(f"{name:<20} {was} -> {actual}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Admin stats reconciled ({len(drift)} corrected)." if drift else "Admin stats are up to date."
+        ))
@@ -0,0 +1,249 @@
+import json
+import os
+from datetime import date
+
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from mycebu_app.models import Department, EmergencyContact, Official, Ordinance, Service
+
+BATCH_SIZE = 500
+
+DATASETS = ["directory", "services", "ordinances"]
+_FILES = {
+    "directory": "directory.json",
+    "services": "services.json",
+    "ordinances": "ordinance.json",
+}
+
+
+# ==========================================
+# FILE -> ROW MAPPING
+# ==========================================
+# Each table is (model, key, rows): `rows` are plain dicts holding the columns
+# the file owns, `key` picks the natural key out of one.
+
+def _official_rows(data):
+    return [{
+        "name": o["name"],
+        "position": o["position"],
+        "office": o.get("office"),
+        "district": o.get("district"),
+        "email": o.get("email"),
+        "phone": o.get("phone"),
+        "initials": o.get("initials"),
+        "photo": o.get("photo"),
+    } for o in data.get("officials", [])]
+
+
+def _department_rows(data):
+    return [{
+        "name": d["name"],
+        "head": d.get("head"),
+        "contact_details": d.get("contact"),
+    } for d in data.get("departmentOffices", [])]
+
+
+def _hotline_rows(data):
+    return [{
+        "service": h["service"],
+        "numbers": h.get("numbers"),
+    } for h in data.get("emergencyContacts", [])]
+
+
+def _service_rows(data):
+    return [{
+        "service_id": s["id"],
+        "icon": s.get("icon", ""),
+        "title": s["title"],
+        "description": s.get("description", ""),
+        "color": s.get("color", ""),
+        "requirements": s.get("requirements", []),
+        "steps": s.get("steps", []),
+        "step_details": s.get("stepDetails", []),
+        "additional_info": s.get("additionalInfo"),
+        "forms": s.get("forms", []),
+        "forms_download": s.get("formsDownload", []),
+    } for s in data.get("services", [])]
+
+
+def _ordinance_rows(data):
+    rows = []
+    for o in data:
+        enacted = o.get("date_of_enactment")
+        rows.append({
+            "category": o["category"],
+            "pdf_file_path": o.get("pdf_file_path", ""),
+            "name_or_ordinance": o["name_or_ordinance"],
+            "author": o.get("author"),
+            "ordinance_number": o.get("ordinance_number"),
+            "date_of_enactment": date.fromisoformat(enacted) if enacted else None,
+        })
+    return rows
+
+
+def _ordinance_key(row):
+    # Titles get corrected now and then; the number is the stable identifier when there is one.
+    return row["ordinance_number"] or row["name_or_ordinance"]
+
+
+def _tables(dataset, data):
+    if dataset == "directory":
+        return [
+            (Official, lambda r: r["name"], _official_rows(data)),
+            (Department, lambda r: r["name"], _department_rows(data)),
+            (EmergencyContact, lambda r: r["service"], _hotline_rows(data)),
+        ]
+    if dataset == "services":
+        return [(Service, lambda r: r["service_id"], _service_rows(data))]
+    return [(Ordinance, _ordinance_key, _ordinance_rows(data))]
+
+
+# ==========================================
+# DIFF + APPLY
+# ==========================================
+
+def _delete_batches(model, pks):
+    """
+    Plain DELETE ... WHERE id IN (...) per batch. QuerySet.delete() would load
+    every row to send post_delete, and the caches follow the tables' data
+    versions (migrations 0023 and 0026) without it.
+    Rows that cascade from these (e.g. ordinance PDF passages) go first.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    pk = model._meta.pk
+    column = connection.ops.quote_name(pk.column)
+    cascades = [rel for rel in model._meta.related_objects if rel.on_delete is models.CASCADE]
+    with connection.cursor() as cursor:
+        for i in range(0, len(pks), BATCH_SIZE):
+            for rel in cascades:
+                rel.related_model._base_manager.filter(**{f"{rel.field.name}__in": pks[i:i + BATCH_SIZE]}).delete()
+            chunk = [pk.get_db_prep_value(v, connection) for v in pks[i:i + BATCH_SIZE]]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", chunk)
+
+
+def sync_table(model, key, rows, delete=False):
+    """
+    Inserts and updates `model`'s rows to match `rows` in one pass: one
+    SELECT, then bulk_create, bulk_update and batched deletes. Rows whose key
+    is in `rows` and appears more than once in the table are collapsed onto
+    the oldest one. Rows not in `rows` are kept unless `delete`. Returns a
+    dict of counts.
+    """
+    if not rows:
+        stale = list(model.objects.values_list("pk", flat=True)) if delete else []
+        _delete_batches(model, stale)
+        return {"inserted": 0, "updated": 0, "deleted": len(stale), "unchanged": 0,
+                "kept": 0 if delete else model.objects.count()}
+
+    fields = list(rows[0].keys())
+    wanted = {}
+    for row in rows:
+        k = key(row)
+        if k in wanted:
+            raise CommandError(f"{model.__name__}: duplicate entry {k!r} in the data file")
+        wanted[k] = row
+
+    existing = {}
+    duplicates = []  # (key, pk)
+    order = "created_at" if any(f.name == "created_at" for f in model._meta.fields) else "pk"
+    for obj in model.objects.only("pk", *fields).order_by(order, "pk"):
+        k = key({f: getattr(obj, f) for f in fields})
+        if k in existing:
+            duplicates.append((k, obj.pk))
+        else:
+            existing[k] = obj
+
+    to_create, to_update = [], []
+    changed_fields = set()
+    unchanged = 0
+    for k, row in wanted.items():
+        obj = existing.pop(k, None)
+        if obj is None:
+            obj = model(**row)
+            if model is Ordinance:
+                obj.created_at = timezone.now()  # not auto_now_add on this table
+            to_create.append(obj)
+        else:
+            changed = [f for f, v in row.items() if getattr(obj, f) != v]
+            if not changed:
+                unchanged += 1
+                continue
+            for f in changed:
+                setattr(obj, f, row[f])
+            changed_fields.update(changed)
+            to_update.append(obj)
+
+    if delete:
+        stale = [obj.pk for obj in existing.values()] + [pk for _, pk in duplicates]
+    else:
+        stale = [pk for k, pk in duplicates if k in wanted]
+
+    model.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+    if to_update:
+        # Only the columns that actually differ, which keeps the CASE expressions small.
+        model.objects.bulk_update(to_update, sorted(changed_fields), batch_size=BATCH_SIZE)
+    _delete_batches(model, stale)
+
+    return {
+        "inserted": len(to_create),
+        "updated": len(to_update),
+        "deleted": len(stale),
+        "unchanged": unchanged,
+        "kept": len(existing) if not delete else 0,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads static/mycebu_app/data/{directory,services,ordinance}.json into the database, "
+        "inserting and updating the rows in the files. Rows that aren't in the files "
+        "(e.g. officials, services and ordinances added by admins) are kept unless "
+        "--prune is given. Everything runs in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("datasets", nargs="*", metavar="dataset",
+                            help=f"Subset of {', '.join(DATASETS)} (default: all)")
+        parser.add_argument("--data-dir", help="Directory holding the JSON files (default: the static data dir)")
+        parser.add_argument("--prune", action="store_true",
+                            help="Also delete every row that is missing from the files, including ones added by admins")
+        parser.add_argument("--dry-run", action="store_true", help="Report the changes, then roll back")
+
+    def _load(self, dataset, data_dir):
+        name = _FILES[dataset]
+        path = os.path.join(data_dir, name) if data_dir else finders.find(f"mycebu_app/data/{name}")
+        if not path or not os.path.exists(path):
+            raise CommandError(f"{name} not found")
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def handle(self, *args, **opts):
+        datasets = opts["datasets"] or DATASETS
+        unknown = set(datasets) - set(DATASETS)
+        if unknown:
+            raise CommandError(f"Unknown dataset(s): {', '.join(sorted(unknown))}. Choose from {', '.join(DATASETS)}.")
+        loaded = {dataset: self._load(dataset, opts["data_dir"]) for dataset in datasets}
+
+        with transaction.atomic():
+            for dataset in datasets:
+                for model, key, rows in _tables(dataset, loaded[dataset]):
+                    counts = sync_table(model, key, rows, delete=opts["prune"])
+                    line = (
+                        f"{model._meta.db_table:<24} inserted {counts['inserted']:>5}  "
+                        f"updated {counts['updated']:>5}  deleted {counts['deleted']:>5}  "
+                        f"unchanged {counts['unchanged']:>5}"
+                    )
+                    if counts["kept"]:
+                        line += f"  kept {counts['kept']:>5}"
+                    self.stdout.write(line)
+
+            if opts["dry_run"]:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING("Dry run: rolled back."))
+                return
+
+        self.stdout.write(self.style.SUCCESS("Reference data synced."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0011_merge_20251209_0141'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordinance',
+            index=models.Index(fields=['category', 'name_or_ordinance'], name='ordinances_cat_name_idx'),
+        ),
+    ]
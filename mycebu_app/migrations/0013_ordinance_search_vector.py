@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Postgres only: a generated tsvector over number, title and author plus a GIN
+# index, used by mycebu_app.search. Other backends rank in Python instead.
+FORWARD = [
+    """
+    ALTER TABLE ordinances ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(ordinance_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(name_or_ordinance, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(author, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ordinances_search_vector_idx ON ordinances USING GIN (search_vector)",
+]
+BACKWARD = [
+    "DROP INDEX IF EXISTS ordinances_search_vector_idx",
+    "ALTER TABLE ordinances DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0012_ordinance_category_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD), _run(BACKWARD)),
+    ]
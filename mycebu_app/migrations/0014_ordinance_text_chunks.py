@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:25
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+# Postgres only, like 0013: full-text vector and GIN index over chunk text.
+FORWARD = [
+    """
+    ALTER TABLE ordinance_chunks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', text)) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ordinance_chunks_search_vector_idx ON ordinance_chunks USING GIN (search_vector)",
+]
+BACKWARD = [
+    "DROP INDEX IF EXISTS ordinance_chunks_search_vector_idx",
+    "ALTER TABLE ordinance_chunks DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(statements):
+    def apply(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0013_ordinance_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordinance',
+            name='text_status',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='OrdinanceChunk',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('page', models.PositiveIntegerField()),
+                ('position', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('ordinance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='mycebu_app.ordinance')),
+            ],
+            options={
+                'db_table': 'ordinance_chunks',
+                'ordering': ['page', 'position'],
+            },
+        ),
+        migrations.RunPython(_run(FORWARD), _run(BACKWARD)),
+    ]
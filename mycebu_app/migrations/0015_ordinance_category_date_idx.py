@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0014_ordinance_text_chunks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordinance',
+            index=models.Index(fields=['category', 'date_of_enactment', 'id'], name='ordinances_cat_date_idx'),
+        ),
+    ]
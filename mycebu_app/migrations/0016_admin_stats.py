@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0015_ordinance_category_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminStat',
+            fields=[
+                ('name', models.TextField(primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'admin_stats',
+            },
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+# Every insert, real update and delete on complaints and service_applications
+# appends a row to change_events. On Postgres the trigger here also sent
+# NOTIFY mycebu_changes with {"id", "kind", "user_id"} for the streaming
+# feeds; the dashboards now poll and migration 0025 drops the NOTIFY.
+# created_at is the wall-clock time of the change (clock_timestamp), which
+# mycebu_app.feed relies on to tell id gaps left by in-flight transactions
+# from rolled-back ones.
+TABLES = [("complaints", "complaint"), ("service_applications", "permit")]
+
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    changed record;
+    event_id bigint;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (kind, object_id, user_id, action, created_at)
+    VALUES (
+        TG_ARGV[0], changed.id, changed.user_id,
+        CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END,
+        clock_timestamp()
+    )
+    RETURNING id INTO event_id;
+    PERFORM pg_notify('mycebu_changes', json_build_object(
+        'id', event_id, 'kind', TG_ARGV[0], 'user_id', changed.user_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRES_TRIGGERS = """
+CREATE TRIGGER {table}_change_log AFTER INSERT OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION log_change_event('{kind}');
+CREATE TRIGGER {table}_change_log_update AFTER UPDATE ON {table}
+    FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*) EXECUTE FUNCTION log_change_event('{kind}')
+"""
+
+SQLITE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_change_log_{action} AFTER {op} ON {table}
+BEGIN
+    INSERT INTO change_events (kind, object_id, user_id, action, created_at)
+    VALUES ('{kind}', {row}.id, {row}.user_id, '{action}', strftime('%Y-%m-%d %H:%M:%f', 'now'));
+END
+"""
+SQLITE_EVENTS = [("INSERT", "NEW", "created"), ("UPDATE", "NEW", "updated"), ("DELETE", "OLD", "deleted")]
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    existing = set(connection.introspection.table_names())
+    tables = [(table, kind) for table, kind in TABLES if table in existing]
+    if connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+        for table, kind in tables:
+            for sql in POSTGRES_TRIGGERS.format(table=table, kind=kind).split(";"):
+                if sql.strip():
+                    schema_editor.execute(sql, params=None)
+    elif connection.vendor == "sqlite":
+        for table, kind in tables:
+            for op, row, action in SQLITE_EVENTS:
+                sql = SQLITE_TRIGGER.format(table=table, kind=kind, op=op, row=row, action=action)
+                schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for table, _ in TABLES:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_change_log ON {table}")
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_change_log_update ON {table}")
+        schema_editor.execute("DROP FUNCTION IF EXISTS log_change_event()")
+    elif connection.vendor == "sqlite":
+        for table, _ in TABLES:
+            for _, _, action in SQLITE_EVENTS:
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_change_log_{action}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0016_admin_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.TextField()),
+                ('object_id', models.UUIDField()),
+                ('user_id', models.UUIDField(blank=True, null=True)),
+                ('action', models.TextField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'change_events',
+                'indexes': [models.Index(fields=['user_id', 'id'], name='change_events_user_idx'), models.Index(fields=['created_at'], name='change_events_created_idx')],
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0017_change_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['user_id', 'created_at', 'id'], name='complaints_user_created_idx'),
+        ),
+    ]
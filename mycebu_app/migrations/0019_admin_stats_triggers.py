@@ -0,0 +1,113 @@
+from django.db import migrations
+
+# The admin stat counters for complaints and permits move from model signals
+# into triggers, so queryset .update() calls, bulk actions and raw SQL are
+# counted too and a status change needs no extra statement from the app.
+# Per table: (table, total stat or None, pending stat, status column, pending value)
+COUNTED = [
+    ("complaints", "total_complaints", "pending_complaints", "status", "Pending"),
+    ("service_applications", None, "pending_permits", "document_status", "pending"),
+]
+
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION count_admin_stats() RETURNS trigger AS $$
+DECLARE
+    total_delta integer := 0;
+    pending_delta integer := 0;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        pending_delta := pending_delta - (to_jsonb(OLD) ->> TG_ARGV[2] IS NOT DISTINCT FROM TG_ARGV[3])::integer;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        pending_delta := pending_delta + (to_jsonb(NEW) ->> TG_ARGV[2] IS NOT DISTINCT FROM TG_ARGV[3])::integer;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        total_delta := 1;
+    ELSIF TG_OP = 'DELETE' THEN
+        total_delta := -1;
+    END IF;
+    UPDATE admin_stats
+    SET value = value + CASE WHEN name = TG_ARGV[0] THEN total_delta ELSE pending_delta END,
+        updated_at = now()
+    WHERE (name = TG_ARGV[0] AND total_delta <> 0) OR (name = TG_ARGV[1] AND pending_delta <> 0);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRES_TRIGGERS = """
+CREATE TRIGGER {table}_admin_stats AFTER INSERT OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION count_admin_stats('{total}', '{pending}', '{column}', '{value}');
+CREATE TRIGGER {table}_admin_stats_update AFTER UPDATE OF {column} ON {table}
+    FOR EACH ROW WHEN (OLD.{column} IS DISTINCT FROM NEW.{column})
+    EXECUTE FUNCTION count_admin_stats('{total}', '{pending}', '{column}', '{value}')
+"""
+
+SQLITE_TRIGGERS = {
+    "insert": """
+CREATE TRIGGER IF NOT EXISTS {table}_admin_stats_insert AFTER INSERT ON {table}
+BEGIN
+    UPDATE admin_stats SET value = value + 1 WHERE name = '{total}';
+    UPDATE admin_stats SET value = value + 1 WHERE name = '{pending}' AND NEW.{column} IS '{value}';
+END
+""",
+    "update": """
+CREATE TRIGGER IF NOT EXISTS {table}_admin_stats_update AFTER UPDATE OF {column} ON {table}
+WHEN OLD.{column} IS NOT NEW.{column}
+BEGIN
+    UPDATE admin_stats SET value = value + (NEW.{column} IS '{value}') - (OLD.{column} IS '{value}')
+    WHERE name = '{pending}';
+END
+""",
+    "delete": """
+CREATE TRIGGER IF NOT EXISTS {table}_admin_stats_delete AFTER DELETE ON {table}
+BEGIN
+    UPDATE admin_stats SET value = value - 1 WHERE name = '{total}';
+    UPDATE admin_stats SET value = value - 1 WHERE name = '{pending}' AND OLD.{column} IS '{value}';
+END
+""",
+}
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    existing = set(connection.introspection.table_names())
+    counted = [row for row in COUNTED if row[0] in existing]
+    if connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+        for table, total, pending, column, value in counted:
+            sql = POSTGRES_TRIGGERS.format(table=table, total=total or "", pending=pending, column=column, value=value)
+            for statement in sql.split(";"):
+                if statement.strip():
+                    schema_editor.execute(statement, params=None)
+    elif connection.vendor == "sqlite":
+        for table, total, pending, column, value in counted:
+            for sql in SQLITE_TRIGGERS.values():
+                schema_editor.execute(
+                    sql.format(table=table, total=total or "", pending=pending, column=column, value=value),
+                    params=None,
+                )
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for table, *_ in COUNTED:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_admin_stats ON {table}")
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_admin_stats_update ON {table}")
+        schema_editor.execute("DROP FUNCTION IF EXISTS count_admin_stats()")
+    elif connection.vendor == "sqlite":
+        for table, *_ in COUNTED:
+            for event in SQLITE_TRIGGERS:
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_admin_stats_{event}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0018_complaints_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,139 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:52
+
+from django.db import migrations, models
+
+# complaint_daily_rollups is kept by row triggers on complaints: an insert adds
+# one to its (day, category, subcategory, location, status) row, a delete
+# takes one away, and an update that changes any of those columns does both.
+# The day is created_at's UTC date (TIME_ZONE is UTC). Locations are
+# normalized by normalize_complaint_location(), which the backfill command and
+# the analytics API use too; SQLite has no regexp_replace, so the triggers
+# here don't collapse inner whitespace there (migration 0027 switches them to
+# the Python normalize_location()).
+
+POSTGRES_FUNCTIONS = [
+    r"""
+CREATE OR REPLACE FUNCTION normalize_complaint_location(text) RETURNS text AS $$
+    SELECT lower(regexp_replace(btrim(coalesce($1, '')), '\s+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE
+""",
+    """
+CREATE OR REPLACE FUNCTION roll_up_complaint() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE complaint_daily_rollups SET count = count - 1
+        WHERE day = (OLD.created_at AT TIME ZONE 'UTC')::date
+          AND category = OLD.category
+          AND subcategory = coalesce(OLD.subcategory, '')
+          AND location = normalize_complaint_location(OLD.location)
+          AND status = OLD.status;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+        VALUES (
+            (NEW.created_at AT TIME ZONE 'UTC')::date, NEW.category, coalesce(NEW.subcategory, ''),
+            normalize_complaint_location(NEW.location), NEW.status, 1
+        )
+        ON CONFLICT (day, category, subcategory, location, status)
+        DO UPDATE SET count = complaint_daily_rollups.count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+]
+
+ROLLUP_COLUMNS = "created_at, category, subcategory, location, status"
+
+POSTGRES_TRIGGERS = [
+    """
+CREATE TRIGGER complaints_rollup AFTER INSERT OR DELETE ON complaints
+    FOR EACH ROW EXECUTE FUNCTION roll_up_complaint()
+""",
+    f"""
+CREATE TRIGGER complaints_rollup_update AFTER UPDATE OF {ROLLUP_COLUMNS} ON complaints
+    FOR EACH ROW WHEN (
+        (OLD.created_at, OLD.category, OLD.subcategory, OLD.location, OLD.status)
+        IS DISTINCT FROM (NEW.created_at, NEW.category, NEW.subcategory, NEW.location, NEW.status)
+    )
+    EXECUTE FUNCTION roll_up_complaint()
+""",
+]
+
+SQLITE_REMOVE = """
+    UPDATE complaint_daily_rollups SET count = count - 1
+    WHERE day = date(OLD.created_at) AND category = OLD.category
+      AND subcategory = coalesce(OLD.subcategory, '')
+      AND location = lower(trim(coalesce(OLD.location, ''))) AND status = OLD.status;
+"""
+SQLITE_ADD = """
+    INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+    VALUES (date(NEW.created_at), NEW.category, coalesce(NEW.subcategory, ''),
+            lower(trim(coalesce(NEW.location, ''))), NEW.status, 1)
+    ON CONFLICT (day, category, subcategory, location, status) DO UPDATE SET count = count + 1;
+"""
+SQLITE_TRIGGERS = {
+    "insert": f"CREATE TRIGGER IF NOT EXISTS complaints_rollup_insert AFTER INSERT ON complaints BEGIN {SQLITE_ADD} END",
+    "update": (
+        f"CREATE TRIGGER IF NOT EXISTS complaints_rollup_update AFTER UPDATE OF {ROLLUP_COLUMNS} ON complaints "
+        "WHEN OLD.created_at IS NOT NEW.created_at OR OLD.category IS NOT NEW.category "
+        "OR OLD.subcategory IS NOT NEW.subcategory OR OLD.location IS NOT NEW.location OR OLD.status IS NOT NEW.status "
+        f"BEGIN {SQLITE_REMOVE} {SQLITE_ADD} END"
+    ),
+    "delete": f"CREATE TRIGGER IF NOT EXISTS complaints_rollup_delete AFTER DELETE ON complaints BEGIN {SQLITE_REMOVE} END",
+}
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        for sql in POSTGRES_FUNCTIONS:
+            schema_editor.execute(sql, params=None)
+    if "complaints" not in connection.introspection.table_names():
+        return
+    if connection.vendor == "postgresql":
+        for sql in POSTGRES_TRIGGERS:
+            schema_editor.execute(sql, params=None)
+    elif connection.vendor == "sqlite":
+        for sql in SQLITE_TRIGGERS.values():
+            schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP TRIGGER IF EXISTS complaints_rollup ON complaints")
+        schema_editor.execute("DROP TRIGGER IF EXISTS complaints_rollup_update ON complaints")
+        schema_editor.execute("DROP FUNCTION IF EXISTS roll_up_complaint()")
+        schema_editor.execute("DROP FUNCTION IF EXISTS normalize_complaint_location(text)")
+    elif connection.vendor == "sqlite":
+        for event in SQLITE_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS complaints_rollup_{event}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0019_admin_stats_triggers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintRollup',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('category', models.TextField()),
+                ('subcategory', models.TextField(default='')),
+                ('location', models.TextField()),
+                ('status', models.TextField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'complaint_daily_rollups',
+                'indexes': [models.Index(fields=['category', 'day'], name='complaint_rollups_cat_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'category', 'subcategory', 'location', 'status'), name='complaint_rollups_key')],
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
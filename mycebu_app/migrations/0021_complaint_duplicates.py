@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0020_complaint_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplaintSignature',
+            fields=[
+                ('complaint', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='mycebu_app.complaint')),
+                ('minhash', models.BinaryField()),
+            ],
+            options={
+                'db_table': 'complaint_signatures',
+            },
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='duplicate_of',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ComplaintBucket',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('key', models.BigIntegerField()),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='mycebu_app.complaint')),
+            ],
+            options={
+                'db_table': 'complaint_lsh_buckets',
+                'indexes': [models.Index(fields=['key'], name='complaint_lsh_key_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,155 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:00
+
+from django.db import migrations, models
+
+# user_summaries holds one row per citizen with their complaint and
+# application counts by status. Row triggers on complaints and
+# service_applications keep it current in the same transaction as the write:
+# an insert upserts the owner's row, a delete takes one away, and a change of
+# owner or status does both. Statuses without a column still count in the
+# total.
+# Per table: (table, total column, status column, {status value: counter column})
+COUNTED = [
+    ("complaints", "complaints_total", "status", {
+        "Pending": "complaints_pending",
+        "In Progress": "complaints_in_progress",
+        "Resolved": "complaints_resolved",
+        "Cancelled": "complaints_cancelled",
+    }),
+    ("service_applications", "applications_total", "document_status", {
+        "draft": "applications_draft",
+        "pending": "applications_pending",
+        "submitted": "applications_submitted",
+        "verified": "applications_verified",
+        "rejected": "applications_rejected",
+    }),
+]
+ALL_COLUMNS = [col for _, total, _, counters in COUNTED for col in (total, *counters.values())]
+
+
+def _is(vendor, row, column, value):
+    """1 if row.column equals value, else 0."""
+    if vendor == "postgresql":
+        return f"(({row}.{column} IS NOT DISTINCT FROM '{value}')::integer)"
+    return f"({row}.{column} IS '{value}')"
+
+
+def _statements(vendor, total, column, counters):
+    """(remove OLD, add NEW) statements for one counted table."""
+    now = "now()" if vendor == "postgresql" else "datetime('now')"
+    target = "user_summaries." if vendor == "postgresql" else ""
+    remove = ", ".join(
+        [f"{total} = {total} - 1"]
+        + [f"{col} = {col} - {_is(vendor, 'OLD', column, value)}" for value, col in counters.items()]
+    )
+    values = {total: "1", **{col: _is(vendor, "NEW", column, value) for value, col in counters.items()}}
+    add = f"""
+        INSERT INTO user_summaries (user_id, {", ".join(ALL_COLUMNS)}, updated_at)
+        VALUES (NEW.user_id, {", ".join(values.get(col, "0") for col in ALL_COLUMNS)}, {now})
+        ON CONFLICT (user_id) DO UPDATE SET
+            {", ".join(f"{col} = {target}{col} + excluded.{col}" for col in values)},
+            updated_at = excluded.updated_at;"""
+    return (
+        f"UPDATE user_summaries SET {remove}, updated_at = {now} WHERE user_id = OLD.user_id;",
+        add,
+    )
+
+
+def _postgres_sql(table, total, column, counters):
+    remove, add = _statements("postgresql", total, column, counters)
+    return [
+        f"""
+CREATE OR REPLACE FUNCTION count_user_{table}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        {remove}
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        {add}
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+""",
+        f"""
+CREATE TRIGGER {table}_user_summary AFTER INSERT OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION count_user_{table}()
+""",
+        f"""
+CREATE TRIGGER {table}_user_summary_update AFTER UPDATE OF user_id, {column} ON {table}
+    FOR EACH ROW WHEN ((OLD.user_id, OLD.{column}) IS DISTINCT FROM (NEW.user_id, NEW.{column}))
+    EXECUTE FUNCTION count_user_{table}()
+""",
+    ]
+
+
+def _sqlite_sql(table, total, column, counters):
+    remove, add = _statements("sqlite", total, column, counters)
+    return {
+        "insert": f"CREATE TRIGGER IF NOT EXISTS {table}_user_summary_insert AFTER INSERT ON {table} BEGIN {add} END",
+        "update": (
+            f"CREATE TRIGGER IF NOT EXISTS {table}_user_summary_update AFTER UPDATE OF user_id, {column} ON {table} "
+            f"WHEN OLD.user_id IS NOT NEW.user_id OR OLD.{column} IS NOT NEW.{column} "
+            f"BEGIN {remove} {add} END"
+        ),
+        "delete": f"CREATE TRIGGER IF NOT EXISTS {table}_user_summary_delete AFTER DELETE ON {table} BEGIN {remove} END",
+    }
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    existing = set(connection.introspection.table_names())
+    for table, total, column, counters in COUNTED:
+        if table not in existing:
+            continue
+        if connection.vendor == "postgresql":
+            for sql in _postgres_sql(table, total, column, counters):
+                schema_editor.execute(sql, params=None)
+        elif connection.vendor == "sqlite":
+            for sql in _sqlite_sql(table, total, column, counters).values():
+                schema_editor.execute(sql, params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    for table, *_ in COUNTED:
+        if connection.vendor == "postgresql":
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_user_summary ON {table}")
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_user_summary_update ON {table}")
+            schema_editor.execute(f"DROP FUNCTION IF EXISTS count_user_{table}()")
+        elif connection.vendor == "sqlite":
+            for event in ("insert", "update", "delete"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_user_summary_{event}")
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0021_complaint_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSummary',
+            fields=[
+                ('user_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('complaints_total', models.IntegerField(default=0)),
+                ('complaints_pending', models.IntegerField(default=0)),
+                ('complaints_in_progress', models.IntegerField(default=0)),
+                ('complaints_resolved', models.IntegerField(default=0)),
+                ('complaints_cancelled', models.IntegerField(default=0)),
+                ('applications_total', models.IntegerField(default=0)),
+                ('applications_draft', models.IntegerField(default=0)),
+                ('applications_pending', models.IntegerField(default=0)),
+                ('applications_submitted', models.IntegerField(default=0)),
+                ('applications_verified', models.IntegerField(default=0)),
+                ('applications_rejected', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'user_summaries',
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
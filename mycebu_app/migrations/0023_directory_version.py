@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:08
+
+from django.db import migrations, models
+
+# The "directory" row of data_versions goes up by one with every write to the
+# directory tables, in the same transaction. The /api/directory/ snapshot and
+# the facet list are cached under it (mycebu_app.directory), so no worker can
+# serve data older than the last commit, and nothing has to invalidate them.
+# On Postgres new versions come from a sequence, so a rolled-back write never
+# hands its number (and whatever was cached under it) to a later one.
+VERSIONED = {
+    "directory": ["directory_officials", "directory_departments", "directory_emergency"],
+}
+
+POSTGRES_SEQUENCE = "CREATE SEQUENCE IF NOT EXISTS data_version_seq"
+
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES (TG_ARGV[0], nextval('data_version_seq'))
+    ON CONFLICT (name) DO UPDATE SET version = excluded.version;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRES_TRIGGER = """
+CREATE TRIGGER {table}_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('{name}')
+"""
+
+SQLITE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_data_version_{event} AFTER {event} ON {table}
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES ('{name}', 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+END
+"""
+SQLITE_EVENTS = ("insert", "update", "delete")
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    existing = set(connection.introspection.table_names())
+    if connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_SEQUENCE, params=None)
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+    for name, tables in VERSIONED.items():
+        for table in tables:
+            if table not in existing:
+                continue
+            if connection.vendor == "postgresql":
+                schema_editor.execute(POSTGRES_TRIGGER.format(table=table, name=name), params=None)
+            elif connection.vendor == "sqlite":
+                for event in SQLITE_EVENTS:
+                    schema_editor.execute(SQLITE_TRIGGER.format(table=table, name=name, event=event), params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    for tables in VERSIONED.values():
+        for table in tables:
+            if connection.vendor == "postgresql":
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_data_version ON {table}")
+            elif connection.vendor == "sqlite":
+                for event in SQLITE_EVENTS:
+                    schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_data_version_{event}")
+    if connection.vendor == "postgresql":
+        schema_editor.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+        schema_editor.execute("DROP SEQUENCE IF EXISTS data_version_seq")
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0022_user_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('name', models.TextField(primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'data_versions',
+            },
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0023_directory_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField()),
+                ('path', models.TextField()),
+                ('key', models.TextField()),
+                ('fingerprint', models.TextField()),
+                ('status', models.IntegerField(blank=True, null=True)),
+                ('content_type', models.TextField(blank=True, default='')),
+                ('content', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'idempotency_keys',
+                'indexes': [models.Index(fields=['created_at'], name='idempotency_keys_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'path', 'key'), name='idempotency_keys_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:02
+
+from django.db import migrations
+
+# The dashboards poll change_events (mycebu_app.feed) and nothing LISTENs
+# any more, so log_change_event() stops sending NOTIFY mycebu_changes on
+# every complaint and permit write. The triggers from 0017 call the function
+# by name and pick up the new body as is. SQLite never notified.
+POSTGRES_FUNCTION = """
+CREATE OR REPLACE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    changed record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (kind, object_id, user_id, action, created_at)
+    VALUES (
+        TG_ARGV[0], changed.id, changed.user_id,
+        CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END,
+        clock_timestamp()
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# The 0017 body, restored when migrating backwards
+POSTGRES_FUNCTION_WITH_NOTIFY = """
+CREATE OR REPLACE FUNCTION log_change_event() RETURNS trigger AS $$
+DECLARE
+    changed record;
+    event_id bigint;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        changed := OLD;
+    ELSE
+        changed := NEW;
+    END IF;
+    INSERT INTO change_events (kind, object_id, user_id, action, created_at)
+    VALUES (
+        TG_ARGV[0], changed.id, changed.user_id,
+        CASE TG_OP WHEN 'INSERT' THEN 'created' WHEN 'UPDATE' THEN 'updated' ELSE 'deleted' END,
+        clock_timestamp()
+    )
+    RETURNING id INTO event_id;
+    PERFORM pg_notify('mycebu_changes', json_build_object(
+        'id', event_id, 'kind', TG_ARGV[0], 'user_id', changed.user_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def drop_notify(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FUNCTION, params=None)
+
+
+def restore_notify(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(POSTGRES_FUNCTION_WITH_NOTIFY, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0024_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_notify, restore_notify),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:20
+
+from django.db import migrations
+
+# Adds an "ordinances" row to data_versions, bumped with every write to the
+# ordinance tables by the bump_data_version() function from 0023. The
+# ordinance overview, facets and the BM25 search index are keyed on it
+# (mycebu_app.ordinances, mycebu_app.search), so like the directory caches
+# they follow every commit on every worker, including queryset updates and
+# the bulk writes of sync_reference_data and the PDF indexer.
+VERSIONED = {
+    "ordinances": ["ordinances", "ordinance_chunks"],
+}
+
+POSTGRES_TRIGGER = """
+CREATE TRIGGER {table}_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version('{name}')
+"""
+
+SQLITE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_data_version_{event} AFTER {event} ON {table}
+BEGIN
+    INSERT INTO data_versions (name, version) VALUES ('{name}', 1)
+    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+END
+"""
+SQLITE_EVENTS = ("insert", "update", "delete")
+
+
+def create_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    existing = set(connection.introspection.table_names())
+    for name, tables in VERSIONED.items():
+        for table in tables:
+            if table not in existing:
+                continue
+            if connection.vendor == "postgresql":
+                schema_editor.execute(POSTGRES_TRIGGER.format(table=table, name=name), params=None)
+            elif connection.vendor == "sqlite":
+                for event in SQLITE_EVENTS:
+                    schema_editor.execute(SQLITE_TRIGGER.format(table=table, name=name, event=event), params=None)
+
+
+def drop_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    for name, tables in VERSIONED.items():
+        for table in tables:
+            if connection.vendor == "postgresql":
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_data_version ON {table}")
+            elif connection.vendor == "sqlite":
+                for event in SQLITE_EVENTS:
+                    schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_data_version_{event}")
+        schema_editor.execute("DELETE FROM data_versions WHERE name = %s", params=[name])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0025_change_events_without_notify'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
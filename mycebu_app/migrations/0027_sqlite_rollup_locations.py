@@ -0,0 +1,78 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:41
+
+from django.db import migrations
+
+# On SQLite the 0020 rollup triggers stored lower(trim(location)), which keeps
+# inner runs of whitespace, while the analytics ?location= filter collapses
+# them, so "Colon  St" was never found. The triggers are recreated to call
+# normalize_complaint_location(), which mycebu_app.signals registers on every
+# SQLite connection as the same Python normalize_location() the filter uses,
+# and the rollups are recounted with it. Postgres already normalizes in SQL.
+ROLLUP_COLUMNS = "created_at, category, subcategory, location, status"
+
+
+def _triggers(location):
+    remove = f"""
+    UPDATE complaint_daily_rollups SET count = count - 1
+    WHERE day = date(OLD.created_at) AND category = OLD.category
+      AND subcategory = coalesce(OLD.subcategory, '')
+      AND location = {location.format(row="OLD")} AND status = OLD.status;
+"""
+    add = f"""
+    INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+    VALUES (date(NEW.created_at), NEW.category, coalesce(NEW.subcategory, ''),
+            {location.format(row="NEW")}, NEW.status, 1)
+    ON CONFLICT (day, category, subcategory, location, status) DO UPDATE SET count = count + 1;
+"""
+    return {
+        "insert": f"CREATE TRIGGER complaints_rollup_insert AFTER INSERT ON complaints BEGIN {add} END",
+        "update": (
+            f"CREATE TRIGGER complaints_rollup_update AFTER UPDATE OF {ROLLUP_COLUMNS} ON complaints "
+            "WHEN OLD.created_at IS NOT NEW.created_at OR OLD.category IS NOT NEW.category "
+            "OR OLD.subcategory IS NOT NEW.subcategory OR OLD.location IS NOT NEW.location OR OLD.status IS NOT NEW.status "
+            f"BEGIN {remove} {add} END"
+        ),
+        "delete": f"CREATE TRIGGER complaints_rollup_delete AFTER DELETE ON complaints BEGIN {remove} END",
+    }
+
+
+NORMALIZED = "normalize_complaint_location({row}.location)"
+# The 0020 expression, restored when migrating backwards
+TRIMMED = "lower(trim(coalesce({row}.location, '')))"
+
+RECOUNT = """
+INSERT INTO complaint_daily_rollups (day, category, subcategory, location, status, count)
+SELECT date(created_at), category, coalesce(subcategory, ''), {location}, status, count(*)
+FROM complaints
+GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def _replace_triggers(schema_editor, location, recount_location):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite" or "complaints" not in connection.introspection.table_names():
+        return
+    for event, sql in _triggers(location).items():
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS complaints_rollup_{event}")
+        schema_editor.execute(sql, params=None)
+    schema_editor.execute("DELETE FROM complaint_daily_rollups")
+    schema_editor.execute(RECOUNT.format(location=recount_location), params=None)
+
+
+def normalize_locations(apps, schema_editor):
+    _replace_triggers(schema_editor, NORMALIZED, "normalize_complaint_location(location)")
+
+
+def trim_locations(apps, schema_editor):
+    _replace_triggers(schema_editor, TRIMMED, "lower(trim(coalesce(location, '')))")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mycebu_app', '0026_ordinance_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_locations, trim_locations),
+    ]
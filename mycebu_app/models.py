@@ -18,9 +18,15 @@ class Complaint(models.Model):
     attachments = models.JSONField(blank=True, null=True)
     created_at = models.DateTimeField()
     updated_at = models.DateTimeField()
+    # Set when an admin merges this complaint into another one
+    duplicate_of = models.UUIDField(blank=True, null=True)
 
     class Meta:
         db_table = "complaints"
+        indexes = [
+            # A citizen's complaint list, newest first, paged on (created_at, id)
+            models.Index(fields=["user_id", "created_at", "id"], name="complaints_user_created_idx"),
+        ]
 
 
 class Ordinance(models.Model):
@@ -32,9 +38,30 @@ class Ordinance(models.Model):
     ordinance_number = models.TextField(blank=True, null=True)
     date_of_enactment = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(blank=True, null=True)
+    # PDF body-text indexing: "" (no PDF), pending, processing, indexed or failed
+    text_status = models.TextField(blank=True, default="")
 
     class Meta:
         db_table = "ordinances"
+        indexes = [
+            # Per-category previews and "View all" pages
+            models.Index(fields=["category", "name_or_ordinance"], name="ordinances_cat_name_idx"),
+            # Keyset pages of "View all" sorted by enactment date
+            models.Index(fields=["category", "date_of_enactment", "id"], name="ordinances_cat_date_idx"),
+        ]
+
+
+class OrdinanceChunk(models.Model):
+    """A passage of an ordinance PDF's text; chunks never span pages."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    ordinance = models.ForeignKey(Ordinance, on_delete=models.CASCADE, related_name="chunks")
+    page = models.PositiveIntegerField()
+    position = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        db_table = "ordinance_chunks"
+        ordering = ["page", "position"]
 
 
 class ServiceApplication(models.Model):
@@ -126,4 +153,147 @@ class ChatHistory(models.Model):
 
     class Meta:
         db_table = "chat_history"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+
+
+class AdminStat(models.Model):
+    """One admin dashboard counter, kept current by mycebu_app.stats."""
+    name = models.TextField(primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "admin_stats"
+
+
+class DataVersion(models.Model):
+    """
+    A counter that database triggers bump whenever a group of tables changes
+    (migrations 0023 and 0026), committed with the write. Caches key on it,
+    so every worker sees a change as soon as it commits, whatever cache
+    backend it has.
+    """
+    name = models.TextField(primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "data_versions"
+
+
+class ChangeEvent(models.Model):
+    """
+    Append-only log of complaint and permit changes, written by database
+    triggers (migration 0017) and read by the live feeds in mycebu_app.feed.
+    """
+    id = models.BigAutoField(primary_key=True)
+    kind = models.TextField()  # "complaint" or "permit"
+    object_id = models.UUIDField()
+    user_id = models.UUIDField(blank=True, null=True)  # owner of the changed row
+    action = models.TextField()  # "created", "updated" or "deleted"
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "change_events"
+        indexes = [
+            models.Index(fields=["user_id", "id"], name="change_events_user_idx"),
+            models.Index(fields=["created_at"], name="change_events_created_idx"),
+        ]
+
+
+class ComplaintRollup(models.Model):
+    """
+    Complaint counts per submission day, category, subcategory, normalized
+    location and current status. Kept by database triggers (migration 0020)
+    and rebuilt by the backfill_complaint_rollups command; the admin
+    analytics API reads only this table.
+    """
+    id = models.BigAutoField(primary_key=True)
+    day = models.DateField()
+    category = models.TextField()
+    subcategory = models.TextField(default="")  # "" when the complaint has none
+    location = models.TextField()  # lowercased, trimmed, inner whitespace collapsed
+    status = models.TextField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "complaint_daily_rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "category", "subcategory", "location", "status"], name="complaint_rollups_key",
+            ),
+        ]
+        indexes = [
+            # Per-category trends over a date range
+            models.Index(fields=["category", "day"], name="complaint_rollups_cat_day_idx"),
+        ]
+
+
+class ComplaintSignature(models.Model):
+    """The MinHash signature of a complaint's text (see mycebu_app.duplicates)."""
+    complaint = models.OneToOneField(Complaint, on_delete=models.CASCADE, primary_key=True, related_name="signature")
+    minhash = models.BinaryField()
+
+    class Meta:
+        db_table = "complaint_signatures"
+
+
+class ComplaintBucket(models.Model):
+    """One LSH band of a complaint's signature, hashed; complaints sharing a key are duplicate candidates."""
+    id = models.BigAutoField(primary_key=True)
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name="lsh_buckets")
+    key = models.BigIntegerField()
+
+    class Meta:
+        db_table = "complaint_lsh_buckets"
+        indexes = [
+            models.Index(fields=["key"], name="complaint_lsh_key_idx"),
+        ]
+
+
+class UserSummary(models.Model):
+    """
+    A citizen's complaint and application counts by status, for the dashboard
+    header. Kept by database triggers (migration 0022) in the same transaction
+    as each write; rebuilt by the backfill_user_summaries command.
+    """
+    user_id = models.UUIDField(primary_key=True)
+    complaints_total = models.IntegerField(default=0)
+    complaints_pending = models.IntegerField(default=0)
+    complaints_in_progress = models.IntegerField(default=0)
+    complaints_resolved = models.IntegerField(default=0)
+    complaints_cancelled = models.IntegerField(default=0)
+    applications_total = models.IntegerField(default=0)
+    applications_draft = models.IntegerField(default=0)
+    applications_pending = models.IntegerField(default=0)
+    applications_submitted = models.IntegerField(default=0)
+    applications_verified = models.IntegerField(default=0)
+    applications_rejected = models.IntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "user_summaries"
+
+
+class IdempotencyKey(models.Model):
+    """
+    An Idempotency-Key a user sent to one URL and the response it got, so a
+    retry reaching any worker is answered from here (see mycebu_app.idempotency).
+    """
+    id = models.BigAutoField(primary_key=True)
+    user_id = models.BigIntegerField()  # the login (auth) user
+    path = models.TextField()
+    key = models.TextField()
+    fingerprint = models.TextField()
+    status = models.IntegerField(blank=True, null=True)  # null while the first attempt is running
+    content_type = models.TextField(blank=True, default="")
+    content = models.BinaryField(blank=True, null=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "idempotency_keys"
+        constraints = [
+            models.UniqueConstraint(fields=["user_id", "path", "key"], name="idempotency_keys_key"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="idempotency_keys_created_idx"),
+        ]
@@ -0,0 +1,194 @@
+"""
+Body-text indexing for ordinance PDFs.
+
+An uploaded PDF is spooled to a temp file and handed to a small background
+pool. The worker reads it one page at a time (the text of a page is all that
+is held in memory), splits each page into passages and writes them to
+OrdinanceChunk in batches. mycebu_app.search matches and ranks those
+passages alongside titles.
+"""
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Ordinance, OrdinanceChunk
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # only needed to index PDF text; ordinances still work without it
+    PdfReader = None
+
+logger = logging.getLogger(__name__)
+
+# Concurrent extractions per process; extraction is CPU-bound, so keep it small.
+ORDINANCE_TEXT_WORKERS = getattr(settings, "ORDINANCE_TEXT_WORKERS", 1)
+
+# Target passage size; long enough for context, short enough to rank precisely.
+CHUNK_CHARS = 1200
+# Passages written per INSERT.
+CHUNK_BATCH = 50
+# Largest PDF the reindex command will download.
+MAX_DOWNLOAD_SIZE = 50 * 1024 * 1024
+
+_DRIVE_FILE = re.compile(r"https://drive\.google\.com/file/d/([\w-]+)")
+
+_executor = {}
+
+
+def _pool():
+    if "pool" not in _executor:
+        _executor["pool"] = ThreadPoolExecutor(max_workers=ORDINANCE_TEXT_WORKERS, thread_name_prefix="ordinance-text")
+    return _executor["pool"]
+
+
+# ==========================================
+# SPOOLING
+# ==========================================
+
+def spool_to_tempfile(chunks):
+    """Writes an iterable of byte chunks to a temp file and returns its path."""
+    fd, path = tempfile.mkstemp(prefix="ordinance-", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in chunks:
+                out.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def download_pdf(url):
+    """
+    Streams a stored PDF to a temp file. Google Drive viewer links (used by
+    the bundled ordinance data) are rewritten to their download URL.
+    """
+    match = _DRIVE_FILE.match(url or "")
+    if match:
+        url = f"https://drive.google.com/uc?export=download&id={match.group(1)}"
+
+    def body():
+        received = 0
+        with requests.get(url, stream=True, timeout=30) as resp:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(64 * 1024):
+                received += len(chunk)
+                if received > MAX_DOWNLOAD_SIZE:
+                    raise ValueError(f"PDF is larger than {MAX_DOWNLOAD_SIZE // (1024 * 1024)} MB")
+                yield chunk
+
+    return spool_to_tempfile(body())
+
+
+# ==========================================
+# EXTRACTION
+# ==========================================
+
+def iter_page_text(path):
+    """Yields (page_number, text) one page at a time, starting at 1."""
+    if PdfReader is None:
+        raise RuntimeError("pypdf is required to index ordinance text (pip install pypdf)")
+    with open(path, "rb") as fh:
+        if fh.read(5) != b"%PDF-":
+            raise ValueError("Not a PDF file")
+        fh.seek(0)
+        reader = PdfReader(fh)
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, page.extract_text() or ""
+
+
+def split_passages(text, max_chars=CHUNK_CHARS):
+    """Splits one page into passages of up to `max_chars`, breaking between paragraphs, then words."""
+    text = re.sub(r"[ \t]+", " ", text)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    passages, current = [], ""
+    for para in paragraphs:
+        para = " ".join(para.split())
+        while len(para) > max_chars:
+            cut = para.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                passages.append(current)
+                current = ""
+            passages.append(para[:cut])
+            para = para[cut:].strip()
+        if current and len(current) + 1 + len(para) > max_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {para}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+
+def index_ordinance_pdf(ordinance_id, path):
+    """
+    Replaces an ordinance's passages with the text of the PDF at `path`.
+    Returns the number of passages written; the ordinance's text_status
+    records the outcome either way.
+    """
+    Ordinance.objects.filter(id=ordinance_id).update(text_status="processing")
+    written = 0
+    try:
+        with transaction.atomic():
+            OrdinanceChunk.objects.filter(ordinance_id=ordinance_id).delete()
+            batch = []
+            for page, text in iter_page_text(path):
+                for position, passage in enumerate(split_passages(text)):
+                    batch.append(OrdinanceChunk(ordinance_id=ordinance_id, page=page, position=position, text=passage))
+                if len(batch) >= CHUNK_BATCH:
+                    OrdinanceChunk.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            OrdinanceChunk.objects.bulk_create(batch)
+            written += len(batch)
+            Ordinance.objects.filter(id=ordinance_id).update(text_status="indexed")
+    except Exception as e:
+        logger.error(f"Ordinance text indexing failed for {ordinance_id}: {e}")
+        Ordinance.objects.filter(id=ordinance_id).update(text_status="failed")
+        raise
+    return written
+
+
+def discard_spooled(path):
+    """Deletes a spooled PDF; a file that is already gone is fine."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _run_indexing(ordinance_id, path):
+    try:
+        index_ordinance_pdf(ordinance_id, path)
+    except Exception:
+        pass  # logged and recorded on the row
+    finally:
+        discard_spooled(path)
+        connection.close()  # this thread's connection; don't hold it between jobs
+
+
+def _submit_indexing(ordinance_id, path):
+    try:
+        _pool().submit(_run_indexing, ordinance_id, path)
+    except Exception as e:
+        logger.error(f"Could not queue ordinance text indexing for {ordinance_id}: {e}")
+        discard_spooled(path)
+
+
+def schedule_ordinance_indexing(ordinance_id, path):
+    """
+    Indexes the spooled PDF at `path` in the background once the current
+    transaction commits. Once this returns the file belongs to the indexer,
+    which deletes it when done (or if the job can't be queued). Until then,
+    and if the transaction rolls back, it is the caller's to delete.
+    """
+    Ordinance.objects.filter(id=ordinance_id).update(text_status="pending")
+    transaction.on_commit(lambda: _submit_indexing(ordinance_id, path))
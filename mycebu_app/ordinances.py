@@ -0,0 +1,99 @@
+"""
+Query helpers for the ordinances tab.
+
+The overview and facet caches are keyed on the "ordinances" data version,
+which database triggers bump with every write to the ordinance tables
+(migration 0026), so every worker sees a change as soon as it commits.
+"""
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Min, Window
+from django.db.models.functions import RowNumber
+
+from .models import DataVersion, Ordinance
+from .pagination import Key
+
+# Cards shown per category on the overview (before "View all").
+ORDINANCE_PREVIEW_SIZE = 3
+
+# "View all" orderings for keyset pagination; each ends in id so it is total.
+# "year" (year, then date, both descending) is the same order as "newest".
+ORDINANCE_SORTS = {
+    "": [Key("name_or_ordinance"), Key("id")],
+    "newest": [Key("date_of_enactment", descending=True), Key("id", descending=True)],
+    "oldest": [Key("date_of_enactment"), Key("id")],
+    "year": [Key("date_of_enactment", descending=True), Key("id", descending=True)],
+}
+# Search results without an explicit sort
+ORDINANCE_RELEVANCE = [Key("search_rank", descending=True), Key("name_or_ordinance"), Key("id")]
+
+ORDINANCE_VERSION_NAME = "ordinances"
+# Entries for older versions are never read again, so they only need to outlive slow workers.
+ORDINANCE_CACHE_TTL = 60 * 60 * 24
+
+
+def ordinance_version():
+    """The committed version of the ordinance tables (0 before their first write)."""
+    return DataVersion.objects.filter(name=ORDINANCE_VERSION_NAME).values_list("version", flat=True).first() or 0
+
+
+def category_previews(qs, per_category=ORDINANCE_PREVIEW_SIZE, ranked=False):
+    """
+    The first `per_category` ordinances (by title) of each category in `qs`,
+    picked in SQL with ROW_NUMBER() OVER (PARTITION BY category). Categories
+    come in the order of their first title, so {% regroup %} sees each once.
+    With `ranked`, `qs` comes from search_ordinances(): each category keeps its
+    best matches and categories are ordered by their best one.
+    """
+    if ranked:
+        order = [F('search_rank').desc(), F('name_or_ordinance').asc(), F('id').asc()]
+        group = Window(Max('search_rank'), partition_by=F('category'))
+        group_order = F('_group').desc()
+    else:
+        order = [F('name_or_ordinance').asc(), F('id').asc()]
+        group = Window(Min('name_or_ordinance'), partition_by=F('category'))
+        group_order = F('_group').asc()
+
+    ranked_qs = qs.annotate(
+        _rank=Window(RowNumber(), partition_by=F('category'), order_by=order),
+        _group=group,
+    ).filter(_rank__lte=per_category).order_by(group_order, 'category', '_rank')
+    return list(ranked_qs.values(*[f.attname for f in Ordinance._meta.concrete_fields]))
+
+
+def ordinance_overview():
+    """category_previews() of every ordinance; the unfiltered tab is the common case, so it is cached."""
+    key = f"ordinances:overview:{ordinance_version()}"
+    previews = cache.get(key)
+    if previews is None:
+        previews = category_previews(Ordinance.objects.all())
+        cache.set(key, previews, ORDINANCE_CACHE_TTL)
+    return previews
+
+
+def _build_ordinance_facets():
+    categories = (
+        Ordinance.objects.exclude(category__isnull=True)
+        .values('category')
+        .annotate(count=Count('id'))
+        .order_by('category')
+    )
+    authors = (
+        Ordinance.objects.exclude(author__isnull=True).exclude(author="")
+        .values('author')
+        .annotate(count=Count('id'))
+        .order_by('author')
+    )
+    return {
+        "categories": [{"value": c['category'], "count": c['count']} for c in categories],
+        "authors": [{"value": a['author'], "count": a['count']} for a in authors],
+    }
+
+
+def ordinance_facets():
+    """{"categories": [{"value", "count"}], "authors": [...]}, sorted by value."""
+    key = f"ordinances:facets:{ordinance_version()}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = _build_ordinance_facets()
+        cache.set(key, facets, ORDINANCE_CACHE_TTL)
+    return facets
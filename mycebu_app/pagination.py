@@ -0,0 +1,169 @@
+"""
+Keyset (seek) pagination with opaque cursors.
+
+Instead of OFFSET, each page is fetched with a WHERE clause that starts right
+after (or before) the last row the client saw, so page 500 costs the same as
+page 1. Orderings are lists of Key(field, descending) and must end in a
+unique field (normally "id") to be total. Cursors are signed tokens that
+carry the boundary row's sort values, the direction and the page number.
+"""
+import json
+from collections import namedtuple
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
+from django.db.models import F, Q
+
+_CURSOR_SALT = "mycebu_app.pagination"
+
+# Above this planner estimate the total is reported as approximate instead of counted.
+EXACT_COUNT_LIMIT = 10000
+
+
+class Key(namedtuple("Key", ["field", "descending"])):
+    """One sort key. NULLs always sort last when reading forward."""
+
+    def __new__(cls, field, descending=False):
+        return super().__new__(cls, field, descending)
+
+
+class KeysetPage:
+    def __init__(self, items, number, next_cursor, prev_cursor, total, total_is_estimate, per_page):
+        self.items = items
+        self.number = number
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.has_next = next_cursor is not None
+        self.has_previous = prev_cursor is not None
+        self.total = total
+        self.total_is_estimate = total_is_estimate
+        self.num_pages = max(1, -(-total // per_page)) if total is not None else None
+
+
+def _nullable(qs, field):
+    try:
+        return qs.model._meta.get_field(field).null
+    except FieldDoesNotExist:  # annotations such as search_rank
+        return False
+
+
+def _encode(values):
+    out = []
+    for v in values:
+        if v is None or isinstance(v, (bool, int, float, str)):
+            out.append(v)
+        elif hasattr(v, "isoformat"):
+            out.append(v.isoformat())
+        else:  # UUID, Decimal
+            out.append(str(v))
+    return out
+
+
+def _decode(qs, ordering, values):
+    out = []
+    for key, v in zip(ordering, values):
+        try:
+            field = qs.model._meta.get_field(key.field)
+        except FieldDoesNotExist:
+            out.append(v)
+            continue
+        out.append(field.to_python(v) if v is not None else None)
+    return out
+
+
+def _order_by(ordering, nullable, reverse):
+    exprs = []
+    for key, null in zip(ordering, nullable):
+        desc = key.descending != reverse
+        # Reading backwards flips NULLS LAST to NULLS FIRST as well
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        kwargs = nulls if null else {}
+        exprs.append(F(key.field).desc(**kwargs) if desc else F(key.field).asc(**kwargs))
+    return exprs
+
+
+def _after(ordering, nullable, values, reverse):
+    """Q for rows strictly after `values` in the (possibly reversed) ordering."""
+    condition = Q(pk__in=[])
+    equal = Q()
+    for key, null, value in zip(ordering, nullable, values):
+        desc = key.descending != reverse
+        nulls_last = not reverse
+        if value is None:
+            beyond = Q(**{f"{key.field}__isnull": False}) if not nulls_last else Q(pk__in=[])
+            same = Q(**{f"{key.field}__isnull": True})
+        else:
+            beyond = Q(**{f"{key.field}__{'lt' if desc else 'gt'}": value})
+            if null and nulls_last:
+                beyond |= Q(**{f"{key.field}__isnull": True})
+            same = Q(**{key.field: value})
+        condition |= equal & beyond
+        equal &= same
+    return condition
+
+
+def estimated_count(qs):
+    """
+    (count, is_estimate). On Postgres, large results use the planner's row
+    estimate (from table statistics) instead of a COUNT(*) scan.
+    """
+    if connection.vendor == "postgresql":
+        sql, params = qs.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= EXACT_COUNT_LIMIT:
+            return estimate, True
+    return qs.count(), False
+
+
+def keyset_page(qs, ordering, cursor=None, per_page=20, fields=None, with_total=True):
+    """
+    One page of `qs` (as dicts of `fields`, default all) in `ordering`,
+    starting from `cursor` (None or an invalid/foreign token gives page 1).
+    """
+    nullable = [_nullable(qs, key.field) for key in ordering]
+    signature = ",".join(f"{'-' if k.descending else ''}{k.field}" for k in ordering)
+
+    state = None
+    if cursor:
+        try:
+            state = signing.loads(cursor, salt=_CURSOR_SALT)
+            if state.get("o") != signature:
+                state = None
+        except signing.BadSignature:
+            state = None
+
+    reverse = bool(state and state["d"] == "p")
+    number = state["p"] if state else 1
+    page_qs = qs
+    if state:
+        page_qs = page_qs.filter(_after(ordering, nullable, _decode(qs, ordering, state["v"]), reverse))
+    page_qs = page_qs.order_by(*_order_by(ordering, nullable, reverse))
+
+    key_fields = [key.field for key in ordering]
+    values = list(fields or []) or [f.attname for f in qs.model._meta.concrete_fields]
+    values += [f for f in key_fields if f not in values]
+    rows = list(page_qs.values(*values)[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if reverse:
+        rows.reverse()
+
+    def make(row, direction, page):
+        return signing.dumps(
+            {"o": signature, "d": direction, "p": page, "v": _encode([row[f] for f in key_fields])},
+            salt=_CURSOR_SALT, compress=True,
+        )
+
+    has_next = (more and not reverse) or (reverse and bool(rows))
+    has_prev = (more and reverse) or (not reverse and number > 1)
+    next_cursor = make(rows[-1], "n", number + 1) if has_next and rows else None
+    prev_cursor = make(rows[0], "p", number - 1) if has_prev and rows else None
+
+    total, estimate = estimated_count(qs) if with_total else (None, False)
+    return KeysetPage(rows, number, next_cursor, prev_cursor, total, estimate, per_page)
@@ -0,0 +1,181 @@
+"""
+Resized WebP/AVIF variants of the large static images (directory portraits,
+hero backgrounds).
+
+`build_variants()` writes the files and a manifest into
+RESPONSIVE_IMAGES['OUTPUT_DIR'], which is served as an extra static dir.
+Everything else here only reads the manifest, so pages keep working (with
+the original image) before the variants have been built.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build variants
+    Image = None
+    features = None
+
+MANIFEST_NAME = "responsive-images.json"
+
+# Preferred first: browsers take the first <source> they support.
+FORMAT_ORDER = ["avif", "webp"]
+_SAVE_OPTIONS = {
+    "avif": {"format": "AVIF", "quality": 55},
+    "webp": {"format": "WEBP", "quality": 78, "method": 6},
+}
+
+
+def _config():
+    return settings.RESPONSIVE_IMAGES
+
+
+def _manifest_path():
+    return os.path.join(_config()["OUTPUT_DIR"], MANIFEST_NAME)
+
+
+# ==========================================
+# BUILD
+# ==========================================
+
+def _iter_sources():
+    """Yields (static_path, absolute_path, widths) for every matching static image."""
+    patterns = _config()["SOURCES"]
+    seen = set()
+    for finder in finders.get_finders():
+        for path, storage in finder.list([]):
+            path = path.replace(os.sep, "/")
+            if path in seen:
+                continue
+            for pattern, widths in patterns.items():
+                if fnmatch.fnmatch(path, pattern):
+                    seen.add(path)
+                    yield path, storage.path(path), widths
+                    break
+
+
+def _supported_formats():
+    return [fmt for fmt in _config()["FORMATS"] if features.check(fmt)]
+
+
+def _encode(img, width, fmt):
+    height = round(img.height * width / img.width)
+    resized = img.resize((width, height), Image.LANCZOS)
+    if fmt != "avif" and resized.mode not in ("RGB", "RGBA"):
+        resized = resized.convert("RGBA")
+    buf = BytesIO()
+    resized.save(buf, **_SAVE_OPTIONS[fmt])
+    return buf.getvalue()
+
+
+def build_variants(force=False, log=None):
+    """
+    Generates every missing variant and rewrites the manifest.
+    Sources whose content hash is unchanged are skipped unless `force`.
+    Returns (built, skipped) counts.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build responsive images (pip install Pillow)")
+
+    log = log or (lambda msg: None)
+    output_dir = _config()["OUTPUT_DIR"]
+    formats = _supported_formats()
+    previous = load_manifest(fresh=True)
+    manifest = {}
+    built = skipped = 0
+
+    for static_path, abs_path, widths in _iter_sources():
+        with open(abs_path, "rb") as fh:
+            digest = hashlib.sha256(fh.read()).hexdigest()
+
+        old = previous.get(static_path)
+        if (
+            not force and old and old["digest"] == digest
+            and {v["format"] for v in old["variants"]} >= set(formats)
+            and all(os.path.exists(os.path.join(output_dir, v["path"])) for v in old["variants"])
+        ):
+            manifest[static_path] = old
+            skipped += 1
+            continue
+
+        with Image.open(abs_path) as img:
+            img.load()
+            entry = {"digest": digest, "width": img.width, "height": img.height, "variants": []}
+            stem, _ = os.path.splitext(static_path)
+            for width in sorted(w for w in widths if w < img.width) or [img.width]:
+                for fmt in formats:
+                    data = _encode(img, width, fmt)
+                    name = f"{stem}-{width}w.{hashlib.sha256(data).hexdigest()[:10]}.{fmt}"
+                    target = os.path.join(output_dir, *name.split("/"))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as out:
+                        out.write(data)
+                    entry["variants"].append({"format": fmt, "width": width, "path": name})
+
+        manifest[static_path] = entry
+        built += 1
+        total = sum(os.path.getsize(os.path.join(output_dir, v["path"])) for v in entry["variants"])
+        log(f"{static_path}: {len(entry['variants'])} variants, {total // 1024} KB total "
+            f"(original {os.path.getsize(abs_path) // 1024} KB)")
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(_manifest_path(), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+    _manifest_cache.clear()
+    return built, skipped
+
+
+# ==========================================
+# LOOKUP
+# ==========================================
+
+_manifest_cache = {}
+
+
+def manifest_stamp():
+    """mtime of the manifest (0 when it hasn't been built); changes whenever variants are rebuilt."""
+    try:
+        return os.path.getmtime(_manifest_path())
+    except OSError:
+        return 0
+
+
+def load_manifest(fresh=False):
+    """Reads the manifest, re-reading only when the file's mtime changes."""
+    path = _manifest_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    if not fresh and _manifest_cache.get("mtime") == mtime:
+        return _manifest_cache["data"]
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    _manifest_cache.update(mtime=mtime, data=data)
+    return data
+
+
+def responsive_sources(static_path):
+    """
+    Returns {"src", "width", "height", "srcset": {format: "url 110w, ..."}}
+    for a static image. `srcset` is empty when no variants have been built.
+    """
+    entry = load_manifest().get(static_path)
+    info = {"src": static(static_path), "width": None, "height": None, "srcset": {}}
+    if not entry:
+        return info
+
+    info["width"] = entry["width"]
+    info["height"] = entry["height"]
+    for fmt in FORMAT_ORDER:
+        variants = [v for v in entry["variants"] if v["format"] == fmt]
+        if variants:
+            info["srcset"][fmt] = ", ".join(f"{static(v['path'])} {v['width']}w" for v in variants)
+    return info
@@ -0,0 +1,258 @@
+"""
+Relevance-ranked ordinance search.
+
+On Postgres, ordinances carry a generated `search_vector` tsvector column
+(ordinance number, title, author) with a GIN index (migration 0013), and so
+do the PDF passages in ordinance_chunks (0014); matches use to_tsquery and
+are ordered by ts_rank. Other databases (SQLite in development) fall back to
+BM25 computed in Python over an in-process index, rebuilt whenever the
+"ordinances" data version (migration 0026) moves on.
+
+Either way `search_ordinances()` returns the queryset filtered and annotated
+with `search_rank`, so callers can keep filtering, paginating and ranking it
+like any other queryset. An ordinance whose number matches a number in the
+query always ranks first.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Ordinance, OrdinanceChunk
+from .ordinances import ordinance_version
+
+# Added to the rank of an ordinance whose number is in the query; larger than any text score.
+NUMBER_BOOST = 1000.0
+# Weight of PDF body text relative to the title fields.
+BODY_WEIGHT = 0.5
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[^\W_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in is it me of on or the this to was what when where "
+    "which who why with about any there their can do does my we you no".split()
+)
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+def _tokens(text):
+    return _TOKEN.findall((text or "").lower())
+
+
+def _stem(term):
+    """Crude suffix stripping so "regulating" finds "regulate"/"regulation" like the english tsquery prefix does."""
+    for suffix in _SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 4:
+            return term[:-len(suffix)]
+    return term
+
+
+def _normalize_number(value):
+    return (value or "").strip().lstrip("0") or (value or "").strip()
+
+
+def parse_query(query):
+    """(terms, numbers): stemmed search terms without stopwords, and the numbers in the query."""
+    tokens = _tokens(query)
+    terms = [_stem(t) for t in tokens if t not in _STOPWORDS]
+    numbers = sorted({_normalize_number(t) for t in tokens if t.isdigit()})
+    return list(dict.fromkeys(terms)), numbers
+
+
+def _no_matches(qs):
+    """An empty result that still has `search_rank`, so callers can order and group by it."""
+    return qs.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def search_ordinances(qs, query, match="all"):
+    """
+    `qs` narrowed to ordinances matching `query`, annotated with `search_rank`
+    and ordered by it. match="all" requires every term (the search box);
+    match="any" ranks documents matching some of them (chatbot questions).
+    """
+    terms, numbers = parse_query(query)
+    if not terms:
+        return _no_matches(qs)
+    if connection.vendor == "postgresql":
+        return _postgres_search(qs, terms, numbers, match)
+    return _bm25_search(qs, terms, numbers, match)
+
+
+# ==========================================
+# POSTGRES
+# ==========================================
+
+_TSQUERY = "to_tsquery('english', %s)"
+_CHUNK_FILTER = (
+    'FROM "ordinance_chunks" c WHERE c."ordinance_id" = "ordinances"."id" '
+    f'AND c."search_vector" @@ {_TSQUERY}'
+)
+_NUMBER_MATCH = "ltrim(\"ordinances\".\"ordinance_number\", '0') = ANY(%s)"
+
+
+def _tsquery(terms, match):
+    # Terms only contain letters/digits, so they are safe tsquery operands.
+    return (" & " if match == "all" else " | ").join(f"{t}:*" for t in terms)
+
+
+def _postgres_search(qs, terms, numbers, match):
+    tsquery = _tsquery(terms, match)
+
+    where = f'"ordinances"."search_vector" @@ {_TSQUERY} OR EXISTS (SELECT 1 {_CHUNK_FILTER})'
+    where_params = [tsquery, tsquery]
+    rank = (
+        f'ts_rank("ordinances"."search_vector", {_TSQUERY}) + {BODY_WEIGHT} * '
+        f'COALESCE((SELECT max(ts_rank(c."search_vector", {_TSQUERY})) {_CHUNK_FILTER}), 0)'
+    )
+    rank_params = [tsquery, tsquery, tsquery]
+    if numbers:
+        where += f" OR {_NUMBER_MATCH}"
+        where_params.append(numbers)
+        rank += f" + CASE WHEN {_NUMBER_MATCH} THEN {NUMBER_BOOST} ELSE 0 END"
+        rank_params.append(numbers)
+
+    return (
+        qs.filter(RawSQL(where, where_params, output_field=BooleanField()))
+        .annotate(search_rank=RawSQL(rank, rank_params, output_field=FloatField()))
+        .order_by("-search_rank", "name_or_ordinance")
+    )
+
+
+# ==========================================
+# BM25 FALLBACK
+# ==========================================
+# Two fields per ordinance: "title" (number, title, author) and "body" (all
+# PDF passages). A term matches an ordinance if it matches either field.
+
+_bm25_index = {}
+
+
+def _field_index(rows):
+    docs = {}
+    postings = defaultdict(set)
+    for pk, tokens in rows.items():
+        counts = Counter(tokens)
+        docs[pk] = (counts, sum(counts.values()))
+        for token in counts:
+            postings[token].add(pk)
+    avgdl = sum(length for _, length in docs.values()) / len(docs) if docs else 0
+    return {"docs": docs, "postings": postings, "avgdl": avgdl}
+
+
+def _build_bm25_index():
+    titles, numbers = {}, {}
+    for pk, title, author, number in Ordinance.objects.values_list("id", "name_or_ordinance", "author", "ordinance_number"):
+        titles[pk] = _tokens(title) + _tokens(author) + _tokens(number)
+        numbers[pk] = _normalize_number(number)
+    bodies = defaultdict(list)
+    for pk, text in OrdinanceChunk.objects.values_list("ordinance_id", "text").iterator():
+        bodies[pk].extend(_tokens(text))
+    return {"title": _field_index(titles), "body": _field_index(bodies), "numbers": numbers, "n": len(titles)}
+
+
+def _term_scores(field, term, n):
+    """BM25 contribution of one term for every document in a field. Prefix match, like `term:*` in Postgres."""
+    postings, docs, avgdl = field["postings"], field["docs"], field["avgdl"]
+    vocab = [token for token in postings if token.startswith(term)]
+    hits = set().union(*(postings[token] for token in vocab)) if vocab else set()
+    if not hits:
+        return {}
+    idf = math.log(1 + (n - len(hits) + 0.5) / (len(hits) + 0.5))
+    scores = {}
+    for pk in hits:
+        counts, length = docs[pk]
+        tf = sum(counts[token] for token in vocab)
+        scores[pk] = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl))
+    return scores
+
+
+def _bm25_scores(terms, numbers, match):
+    version = ordinance_version()
+    if _bm25_index.get("version") != version:
+        _bm25_index.update(version=version, index=_build_bm25_index())
+    index = _bm25_index["index"]
+
+    scores = defaultdict(float)
+    matched_terms = defaultdict(int)
+    for term in terms:
+        title = _term_scores(index["title"], term, index["n"])
+        body = _term_scores(index["body"], term, index["n"])
+        for pk in title.keys() | body.keys():
+            scores[pk] += title.get(pk, 0.0) + BODY_WEIGHT * body.get(pk, 0.0)
+            matched_terms[pk] += 1
+
+    if match == "all":
+        scores = {pk: s for pk, s in scores.items() if matched_terms[pk] == len(terms)}
+    for pk, number in index["numbers"].items():
+        if number and number in numbers:
+            scores[pk] = scores.get(pk, 0.0) + NUMBER_BOOST
+    return scores
+
+
+def _bm25_search(qs, terms, numbers, match):
+    scores = _bm25_scores(terms, numbers, match)
+    if not scores:
+        return _no_matches(qs)
+    rank = Case(
+        *[When(id=pk, then=Value(score)) for pk, score in scores.items()],
+        default=Value(0.0), output_field=FloatField(),
+    )
+    return qs.filter(id__in=list(scores)).annotate(search_rank=rank).order_by("-search_rank", "name_or_ordinance")
+
+
+# ==========================================
+# PASSAGES
+# ==========================================
+
+def best_passage(ordinance_id, query):
+    """The ordinance's PDF passage that best matches `query` (any term), or None."""
+    terms, _ = parse_query(query)
+    if not terms:
+        return None
+    chunks = OrdinanceChunk.objects.filter(ordinance_id=ordinance_id)
+    if connection.vendor == "postgresql":
+        tsquery = _tsquery(terms, "any")
+        return (
+            chunks.filter(RawSQL(f'"ordinance_chunks"."search_vector" @@ {_TSQUERY}', [tsquery], output_field=BooleanField()))
+            .annotate(passage_rank=RawSQL(f'ts_rank("ordinance_chunks"."search_vector", {_TSQUERY})', [tsquery], output_field=FloatField()))
+            .order_by("-passage_rank", "page", "position")
+            .first()
+        )
+
+    prefixes = tuple(terms)
+    best, best_hits = None, 0
+    for chunk in chunks:
+        hits = sum(1 for token in _tokens(chunk.text) if token.startswith(prefixes))
+        if hits > best_hits:
+            best, best_hits = chunk, hits
+    return best
+
+
+# ==========================================
+# HIGHLIGHTING
+# ==========================================
+
+def highlight(text, query):
+    """`text` HTML-escaped, with words matching the query wrapped in <mark>."""
+    terms, numbers = parse_query(query)
+    prefixes = tuple(terms)
+    if not text or not prefixes:
+        return escape(text or "")
+
+    out = []
+    last = 0
+    for m in _TOKEN.finditer(text):
+        word = m.group(0).lower()
+        if word.startswith(prefixes) and word not in _STOPWORDS or (word.isdigit() and _normalize_number(word) in numbers):
+            out.append(escape(text[last:m.start()]))
+            out.append(f"<mark>{escape(m.group(0))}</mark>")
+            last = m.end()
+    out.append(escape(text[last:]))
+    return mark_safe("".join(out))
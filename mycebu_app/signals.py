@@ -0,0 +1,49 @@
+"""
+The admin user counter, hooked to the model rather than the views so admin
+actions, the Django admin and shell edits all count, and the SQL functions
+SQLite connections need.
+"""
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.models import User as DbUser
+
+from .analytics import normalize_location
+from .stats import adjust_stats
+
+
+# The directory and ordinance caches need no receivers: they are keyed on
+# data versions that database triggers bump (see mycebu_app.directory and
+# mycebu_app.ordinances).
+
+
+# ==========================================
+# ADMIN STATS
+# ==========================================
+# Complaint and permit counters are kept by database triggers (migration
+# 0019); users are counted here.
+
+@receiver(post_save, sender=DbUser)
+@receiver(post_delete, sender=DbUser)
+def user_counted(sender, created=False, **kwargs):
+    if created:
+        adjust_stats(total_users=1)
+    elif kwargs["signal"] is post_delete:
+        adjust_stats(total_users=-1)
+
+
+# ==========================================
+# SQLITE FUNCTIONS
+# ==========================================
+# Postgres defines normalize_complaint_location() in SQL (migration 0020).
+# SQLite has no regexp_replace, so its rollup triggers (migration 0027) call
+# the Python function the analytics filter uses; a connection opened outside
+# Django can't write to complaints.
+
+@receiver(connection_created)
+def register_sqlite_functions(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        connection.connection.create_function(
+            "normalize_complaint_location", 1, normalize_location, deterministic=True,
+        )
@@ -0,0 +1,74 @@
+"""
+A local stand-in for the Cloudinary upload API.
+
+It accepts the same `POST /v1_1/<cloud>/<resource_type>/upload` and `/destroy`
+calls the SDK makes, waits a configurable amount of time to imitate network
+latency, and answers with a Cloudinary-shaped JSON body. Point
+CLOUDINARY_UPLOAD_PREFIX at it to exercise or benchmark upload code without
+touching the real account.
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        # Drain the body in chunks so big files behave like a real upload.
+        remaining = length
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+        time.sleep(self.server.latency)
+
+        parts = self.path.strip("/").split("/")
+        action = parts[-1] if parts else ""
+        resource_type = parts[-2] if len(parts) >= 2 else "image"
+
+        if action == "destroy":
+            body = {"result": "ok"}
+        else:
+            public_id = f"standin/{uuid.uuid4().hex}"
+            body = {
+                "public_id": public_id,
+                "resource_type": resource_type,
+                "bytes": length,
+                "secure_url": f"http://{self.server.server_address[0]}:{self.server.server_address[1]}/{public_id}",
+            }
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_standin_server(host="127.0.0.1", port=0, latency=0.25, verbose=False):
+    """Builds (but does not start) a stand-in server. Port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), _StandInHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.verbose = verbose
+    return server
+
+
+def start_standin_server(**kwargs):
+    """Starts a stand-in server on a background thread and returns (server, upload_prefix)."""
+    server = make_standin_server(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, name="standin-storage", daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
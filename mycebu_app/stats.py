@@ -0,0 +1,75 @@
+"""
+Counters for the admin dashboard header.
+
+Each stat is a row in admin_stats, adjusted in the same transaction as the
+write that changes it, so the header is one small SELECT instead of a COUNT
+per stat. Complaint and permit counters are maintained by database triggers
+(migration 0019), which also see queryset .update() calls and raw SQL; the
+user counter by mycebu_app.signals. The reconcile_admin_stats command
+recounts everything to correct any drift (e.g. a database whose tables were
+created after the triggers' migration ran).
+"""
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from accounts.models import User as DbUser
+
+from .models import AdminStat, Complaint, ServiceApplication
+
+# The status values the app actually writes (see submit_complaint_view and upload_permit_document);
+# the triggers in migration 0019 count the same values
+PENDING_COMPLAINT_STATUS = "Pending"
+PENDING_PERMIT_STATUS = "pending"
+
+ADMIN_STATS = ["total_complaints", "pending_complaints", "total_users", "pending_permits"]
+
+
+def _exact_counts():
+    return {
+        "total_complaints": Complaint.objects.count(),
+        "pending_complaints": Complaint.objects.filter(status=PENDING_COMPLAINT_STATUS).count(),
+        "total_users": DbUser.objects.count(),
+        "pending_permits": ServiceApplication.objects.filter(document_status=PENDING_PERMIT_STATUS).count(),
+    }
+
+
+def adjust_stats(**deltas):
+    """Adds each delta to its counter in one UPDATE. Counters not created yet are left to reconcile_stats()."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    AdminStat.objects.filter(name__in=deltas).update(
+        value=F("value") + Case(
+            *[When(name=name, then=Value(delta)) for name, delta in deltas.items()],
+            default=Value(0), output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def reconcile_stats():
+    """
+    Recounts every stat and stores the exact values. Returns {name: (stored, actual)}
+    for the stats that had drifted (stored is None when the row was missing).
+    The stat rows stay locked while counting, so concurrent adjustments wait
+    and land on top of the new values instead of being overwritten.
+    """
+    with transaction.atomic():
+        stored = dict(AdminStat.objects.select_for_update().values_list("name", "value"))
+        actual = _exact_counts()
+        drift = {}
+        for name, value in actual.items():
+            if stored.get(name) != value:
+                drift[name] = (stored.get(name), value)
+                AdminStat.objects.update_or_create(name=name, defaults={"value": value})
+    return drift
+
+
+def get_admin_stats():
+    """The dashboard header counters. One query; the first call after a fresh install counts once."""
+    values = dict(AdminStat.objects.filter(name__in=ADMIN_STATS).values_list("name", "value"))
+    if len(values) < len(ADMIN_STATS):
+        reconcile_stats()
+        values = dict(AdminStat.objects.filter(name__in=ADMIN_STATS).values_list("name", "value"))
+    return {name: values.get(name, 0) for name in ADMIN_STATS}
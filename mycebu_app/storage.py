@@ -0,0 +1,146 @@
+"""
+Storage backends that accept a file as a stream of chunks.
+
+Each backend hands out a writer per file. The writer gets chunks as the
+request body is parsed, so a document never has to sit in memory (or in a
+temp file) as a whole before it reaches storage.
+"""
+import os
+import uuid
+
+import cloudinary.uploader
+
+from django.conf import settings
+
+from .uploads import configure_cloudinary
+
+# Cloudinary rejects chunked parts smaller than 5 MB (except the last one).
+CLOUDINARY_PART_SIZE = 6 * 1024 * 1024
+
+
+class StorageWriter:
+    """Receives one file chunk by chunk. close() returns the public URL."""
+
+    def write(self, chunk):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def abort(self):
+        raise NotImplementedError
+
+
+class StorageBackend:
+    def open(self, folder, file_name, content_type=None):
+        raise NotImplementedError
+
+
+# ==========================================
+# LOCAL FILESYSTEM (development and tests)
+# ==========================================
+
+class _LocalWriter(StorageWriter):
+    def __init__(self, path, url):
+        self.path = path
+        self.url = url
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fh = open(path, "wb")
+
+    def write(self, chunk):
+        self._fh.write(chunk)
+
+    def close(self):
+        self._fh.close()
+        return self.url
+
+    def abort(self):
+        self._fh.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class LocalFileSystemStorage(StorageBackend):
+    def __init__(self, root=None, base_url=None):
+        self.root = root or settings.UPLOAD_LOCAL_ROOT
+        self.base_url = (base_url or settings.UPLOAD_LOCAL_URL).rstrip("/")
+
+    def open(self, folder, file_name, content_type=None):
+        safe_name = f"{uuid.uuid4().hex}_{os.path.basename(file_name)}"
+        rel_path = f"{folder.strip('/')}/{safe_name}"
+        return _LocalWriter(os.path.join(self.root, *rel_path.split("/")), f"{self.base_url}/{rel_path}")
+
+
+# ==========================================
+# CLOUDINARY (chunked upload API)
+# ==========================================
+
+class _CloudinaryWriter(StorageWriter):
+    """
+    Buffers at most one part and ships it with Cloudinary's chunked upload API.
+    Memory per upload is bounded by part_size no matter how large the file is.
+    """
+
+    def __init__(self, folder, file_name, part_size):
+        self.folder = folder
+        self.file_name = file_name
+        self.part_size = part_size
+        self.upload_id = uuid.uuid4().hex
+        self.offset = 0
+        self.public_id = None
+        self.result = None
+        self._buffer = bytearray()
+
+    def _send(self, total):
+        part = bytes(self._buffer)
+        self._buffer.clear()
+        start = self.offset
+        self.offset += len(part)
+        options = {
+            "folder": f"mycebu/{self.folder}",
+            "resource_type": "auto",
+            "http_headers": {
+                # Total is unknown until the last part; Cloudinary accepts -1 meanwhile.
+                "Content-Range": f"bytes {start}-{self.offset - 1}/{total}",
+                "X-Unique-Upload-Id": self.upload_id,
+            },
+        }
+        if self.public_id:
+            options["public_id"] = self.public_id
+        self.result = cloudinary.uploader.upload_large_part((self.file_name, part), **options)
+        self.public_id = self.result.get("public_id")
+
+    def write(self, chunk):
+        self._buffer.extend(chunk)
+        if len(self._buffer) >= self.part_size:
+            self._send(-1)
+
+    def close(self):
+        self._send(self.offset + len(self._buffer))
+        return self.result.get("secure_url")
+
+    def abort(self):
+        self._buffer.clear()
+        if self.public_id:
+            try:
+                cloudinary.uploader.destroy(self.public_id, resource_type=self.result.get("resource_type", "raw"))
+            except Exception:
+                pass
+
+
+class CloudinaryStorage(StorageBackend):
+    def __init__(self, part_size=CLOUDINARY_PART_SIZE):
+        self.part_size = part_size
+
+    def open(self, folder, file_name, content_type=None):
+        configure_cloudinary()
+        return _CloudinaryWriter(folder, file_name, self.part_size)
+
+
+def get_upload_storage():
+    """Returns the backend selected by settings.UPLOAD_STORAGE ('cloudinary' or 'local')."""
+    if getattr(settings, "UPLOAD_STORAGE", "cloudinary") == "local":
+        return LocalFileSystemStorage()
+    return CloudinaryStorage()
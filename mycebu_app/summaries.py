@@ -0,0 +1,70 @@
+"""
+Per-citizen dashboard counters.
+
+A citizen's complaint and application counts by status live in one
+user_summaries row (UserSummary), kept by database triggers (migration 0022)
+in the same transaction as every write to complaints or service_applications.
+The dashboard header reads that row through /api/me/summary/ instead of
+listing anything. rebuild_user_summaries() recounts every row for the
+backfill_user_summaries command.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Complaint, ServiceApplication, UserSummary
+
+# Section of the summary -> (model, status field, total column, {status value: column}).
+# Migration 0022's triggers count the same values.
+USER_SUMMARY_COUNTERS = {
+    "complaints": (Complaint, "status", "complaints_total", {
+        "Pending": "complaints_pending",
+        "In Progress": "complaints_in_progress",
+        "Resolved": "complaints_resolved",
+        "Cancelled": "complaints_cancelled",
+    }),
+    "applications": (ServiceApplication, "document_status", "applications_total", {
+        "draft": "applications_draft",
+        "pending": "applications_pending",
+        "submitted": "applications_submitted",
+        "verified": "applications_verified",
+        "rejected": "applications_rejected",
+    }),
+}
+
+
+def get_user_summary(user_id):
+    """{section: {"total": n, status: n, ...}} for one user, from their summary row (zeros if they have none)."""
+    row = UserSummary.objects.filter(user_id=user_id).values().first() or {}
+    return {
+        section: {"total": row.get(total, 0), **{status: row.get(col, 0) for status, col in counters.items()}}
+        for section, (_, _, total, counters) in USER_SUMMARY_COUNTERS.items()
+    }
+
+
+def _counts(model, field, total, counters):
+    aggregates = {total: Count("pk"), **{col: Count("pk", filter=Q(**{field: status})) for status, col in counters.items()}}
+    return model.objects.values("user_id").annotate(**aggregates)
+
+
+def rebuild_user_summaries():
+    """
+    Recounts every user's row from complaints and service_applications and
+    returns the number of rows written. Writes to those tables wait until it
+    commits so the triggers can't count a row twice.
+    """
+    now = timezone.now()
+    rows = {}
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("LOCK TABLE complaints, service_applications IN SHARE MODE")
+        for model, field, total, counters in USER_SUMMARY_COUNTERS.values():
+            for counts in _counts(model, field, total, counters):
+                user_id = counts.pop("user_id")
+                rows.setdefault(user_id, UserSummary(user_id=user_id, updated_at=now))
+                for col, value in counts.items():
+                    setattr(rows[user_id], col, value)
+        UserSummary.objects.all().delete()
+        UserSummary.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
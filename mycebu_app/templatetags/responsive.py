@@ -0,0 +1,42 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from mycebu_app.responsive_images import FORMAT_ORDER, load_manifest
+
+register = template.Library()
+
+_MIME = {"avif": "image/avif", "webp": "image/webp"}
+
+
+@register.simple_tag
+def responsive_bg(selector, path, overlay=None):
+    """
+    <style> block giving `selector` a background that grows with the viewport:
+    each breakpoint gets the smallest variant at least as wide as the screen,
+    in the best format the browser supports (image-set), with the original last.
+    """
+    entry = load_manifest().get(path)
+    layer = f"linear-gradient({overlay}, {overlay}), " if overlay else ""
+    original = static(path)
+
+    if not entry:
+        return format_html("<style>{} {{ background-image: {}url('{}'); }}</style>", selector, layer, original)
+
+    widths = sorted({v["width"] for v in entry["variants"]})
+    rules = []
+    for i, width in enumerate(widths):
+        options = [
+            f"url('{static(v['path'])}') type('{_MIME[v['format']]}')"
+            for fmt in FORMAT_ORDER
+            for v in entry["variants"] if v["format"] == fmt and v["width"] == width
+        ]
+        options.append(f"url('{original}')")
+        rule = f"{selector} {{ background-image: {layer}image-set({', '.join(options)}); }}"
+        if i > 0:
+            rule = f"@media (min-width: {widths[i - 1] + 1}px) {{ {rule} }}"
+        rules.append(rule)
+
+    # Built from the manifest and template literals only; escaping would break the CSS.
+    return format_html("<style>{}</style>", mark_safe("\n".join(rules)))
@@ -1,3 +1,104 @@
+import json
+
+from django.contrib.auth.models import User as DjangoAuthUser
 from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User as DbUser
+
+from .models import Complaint, Ordinance, ServiceApplication
+
+# Every request below also loads the session, the auth user and the DbUser
+# (get_authed_user) before the status change itself.
+AUTH_QUERIES = 3
+
+
+class StatusUpdateQueryTests(TestCase):
+    """A status change is one UPDATE ... RETURNING: no SELECT before or after it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.admin_login = DjangoAuthUser.objects.create_user("admin", "admin@example.com", "pw")
+        cls.citizen_login = DjangoAuthUser.objects.create_user("citizen", "citizen@example.com", "pw")
+        DbUser.objects.create(email="admin@example.com", first_name="Ada", last_name="Admin", role="admin")
+        cls.citizen = DbUser.objects.create(email="citizen@example.com", first_name="Cid", last_name="Citizen")
+        cls.complaint = Complaint.objects.create(
+            user_id=cls.citizen.id, category="Roads", subject="Pothole", location="Lahug",
+            description="Deep pothole", status="Pending", created_at=now, updated_at=now,
+        )
+        cls.permit = ServiceApplication.objects.create(
+            user_id=cls.citizen.id, service_type="business-permit", reference_number="BP-0001",
+            document_status="pending", created_at=now, updated_at=now,
+        )
+
+    def post_json(self, url, body):
+        return self.client.post(url, json.dumps(body), content_type="application/json")
+
+    def test_owner_complaint_status_update(self):
+        self.client.force_login(self.citizen_login)
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            response = self.post_json(f"/complaints/{self.complaint.id}/status/", {"status": "Cancelled"})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["complaint"]["id"], str(self.complaint.id))
+        self.assertEqual(body["complaint"]["status"], "Cancelled")
+        self.complaint.refresh_from_db()
+        self.assertEqual(self.complaint.status, "Cancelled")
+
+    def test_complaint_status_update_is_guarded_by_owner(self):
+        self.client.force_login(self.admin_login)
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            response = self.post_json(f"/complaints/{self.complaint.id}/status/", {"status": "Cancelled"})
+
+        self.assertEqual(response.status_code, 404)
+        self.complaint.refresh_from_db()
+        self.assertEqual(self.complaint.status, "Pending")
+
+    def test_admin_complaint_status_update(self):
+        self.client.force_login(self.admin_login)
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            response = self.post_json("/admin-action/update_complaint/", {"id": str(self.complaint.id), "status": "Resolved"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["complaint"]["status"], "Resolved")
+        self.complaint.refresh_from_db()
+        self.assertEqual(self.complaint.status, "Resolved")
+
+    def test_admin_permit_status_update(self):
+        self.client.force_login(self.admin_login)
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            response = self.post_json("/admin-action/update_permit_status/", {
+                "id": str(self.permit.id), "document_status": "verified", "admin_notes": "All documents in order",
+            })
+
+        self.assertEqual(response.status_code, 200)
+        permit = response.json()["permit"]
+        self.assertEqual(permit["document_status"], "verified")
+        self.assertIsNotNone(permit["completed_at"])
+        self.permit.refresh_from_db()
+        self.assertEqual(self.permit.admin_notes, "All documents in order")
+
+
+class OrdinanceSearchTests(TestCase):
+    """A search with nothing to find renders an empty page, not an error."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Ordinance.objects.create(
+            category="Traffic", ordinance_number="123", name_or_ordinance="Regulating street parking",
+            author="Councilor Cruz", created_at=timezone.now(),
+        )
+
+    def test_stopword_only_query(self):
+        response = self.client.get("/ordinances/", {"q": "the"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["ordinances_data"]), [])
+
+    def test_query_without_matches(self):
+        response = self.client.get("/ordinances/", {"q": "nomatchxyz"})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["ordinances_data"]), [])
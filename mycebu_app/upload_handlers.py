@@ -0,0 +1,102 @@
+import hashlib
+import logging
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+
+from .storage import get_upload_storage
+
+logger = logging.getLogger(__name__)
+
+
+class StoredFile(UploadedFile):
+    """
+    What ends up in request.FILES for a streamed field. The bytes are already in
+    storage, so there is nothing to read; use .url, .size and .checksum instead.
+    """
+
+    def __init__(self, name, content_type, size, charset, url, checksum):
+        super().__init__(file=None, name=name, content_type=content_type, size=size, charset=charset)
+        self.url = url
+        self.checksum = checksum
+
+    def open(self, mode=None):
+        raise ValueError("StoredFile has already been streamed to storage; use .url")
+
+
+class StreamingStorageUploadHandler(FileUploadHandler):
+    """
+    Sends each chunk of an uploaded file to the storage backend as soon as it
+    arrives and hashes it on the way through.
+
+    Only fields listed in `fields` are streamed; others fall through to Django's
+    default handlers. If a file grows past `max_size`, the partial upload is
+    discarded and the connection is reset instead of reading the rest of the
+    body, so the client sees a network error rather than the view's 400 (the
+    permit page checks the size before sending). A storage failure at the end
+    of the file only stops parsing and the view answers normally; the view
+    checks `handler.rejected` in both cases.
+    """
+
+    chunk_size = 64 * 2 ** 10
+
+    def __init__(self, request=None, folder="uploads", fields=None, max_size=None, storage=None):
+        super().__init__(request)
+        self.folder = folder
+        self.fields = set(fields) if fields else None
+        self.max_size = max_size
+        self.storage = storage or get_upload_storage()
+        self.rejected = None
+        self._writer = None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if self.fields is not None and field_name not in self.fields:
+            return
+        self._size = 0
+        self._sha256 = hashlib.sha256()
+        self._writer = self.storage.open(self.folder, file_name, content_type)
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self._writer is None:
+            return raw_data
+
+        self._size += len(raw_data)
+        if self.max_size is not None and self._size > self.max_size:
+            self._writer.abort()
+            self._writer = None
+            self.rejected = {"field": self.field_name, "file": self.file_name, "reason": "too_large"}
+            raise StopUpload(connection_reset=True)
+
+        self._sha256.update(raw_data)
+        self._writer.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self._writer is None:
+            return None
+
+        writer, self._writer = self._writer, None
+        try:
+            url = writer.close()
+        except Exception as e:
+            logger.error(f"Streaming upload of {self.file_name} failed: {e}")
+            writer.abort()
+            self.rejected = {"field": self.field_name, "file": self.file_name, "reason": "storage_error"}
+            # The body has been read by now, so let the view's 500 through
+            raise StopUpload()
+
+        return StoredFile(
+            name=self.file_name,
+            content_type=self.content_type,
+            size=self._size,
+            charset=self.charset,
+            url=url,
+            checksum=self._sha256.hexdigest(),
+        )
+
+    def upload_interrupted(self):
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
@@ -0,0 +1,202 @@
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+import cloudinary
+import cloudinary.uploader
+import cloudinary.utils
+
+from django.conf import settings
+from django.core import signing
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrent uploads for a single request. Keeps one complaint
+# with many photos from opening an unbounded number of sockets to Cloudinary.
+UPLOAD_MAX_WORKERS = getattr(settings, "UPLOAD_MAX_WORKERS", 4)
+
+# How long a browser has to finish a signed direct upload and confirm it.
+DIRECT_UPLOAD_TTL = getattr(settings, "DIRECT_UPLOAD_TTL", 600)
+_DIRECT_UPLOAD_SALT = "mycebu_app.direct_upload"
+
+
+class UploadBatchError(Exception):
+    """Raised when one file in a batch fails; the rest of the batch is rolled back."""
+
+    def __init__(self, file_name, original):
+        self.file_name = file_name
+        self.original = original
+        super().__init__(f"Upload of '{file_name}' failed: {original}")
+
+
+class DirectUploadError(Exception):
+    """Raised when a direct-upload confirmation cannot be trusted."""
+
+
+# ==========================================
+# CLOUDINARY UPLOAD HELPERS
+# ==========================================
+
+def configure_cloudinary():
+    """
+    Applies the project credentials to the Cloudinary SDK.
+    UPLOAD_PREFIX is empty in production; locally it can point at the stand-in server.
+    """
+    cfg = settings.CLOUDINARY_STORAGE
+    options = {
+        "cloud_name": cfg['CLOUD_NAME'],
+        "api_key": cfg['API_KEY'],
+        "api_secret": cfg['API_SECRET'],
+    }
+    if cfg.get('UPLOAD_PREFIX'):
+        options["upload_prefix"] = cfg['UPLOAD_PREFIX']
+    cloudinary.config(**options)
+
+
+def _upload(file_obj, folder, public_id=None):
+    """Uploads one file and returns the raw Cloudinary response."""
+    options = {}
+    if public_id:
+        options["public_id"] = public_id
+    return cloudinary.uploader.upload(
+        file_obj,
+        folder=f"mycebu/{folder}",
+        resource_type="auto",
+        **options
+    )
+
+
+def upload_to_cloudinary(file_obj, folder="profiles"):
+    """
+    Uploads a file object to Cloudinary.
+    """
+    configure_cloudinary()
+    upload_result = _upload(file_obj, folder)
+    return upload_result.get("secure_url")
+
+
+def _discard(results):
+    """Best-effort delete of assets that finished before a batch failed."""
+    for result in results:
+        public_id = result.get("public_id")
+        if not public_id:
+            continue
+        try:
+            cloudinary.uploader.destroy(public_id, resource_type=result.get("resource_type", "image"))
+        except Exception as e:
+            logger.warning(f"Could not discard orphaned upload {public_id}: {e}")
+
+
+def upload_many_to_cloudinary(files, folder, max_workers=None, public_ids=None):
+    """
+    Uploads several files concurrently on a bounded thread pool.
+
+    Returns one secure_url per file, in the same order as `files`.
+    `public_ids`, if given, names each file (same order) instead of random ids.
+    On the first failure, uploads that have not started are cancelled, in-flight
+    ones are awaited, anything already stored is deleted again and
+    UploadBatchError is raised, so a request never keeps half a batch.
+    """
+    files = list(files)
+    if not files:
+        return []
+
+    configure_cloudinary()
+    workers = max(1, min(max_workers or UPLOAD_MAX_WORKERS, len(files)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+        names = public_ids or [None] * len(files)
+        futures = [pool.submit(_upload, f, folder, name) for f, name in zip(files, names)]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+
+        failed = next((fut for fut in futures if fut in done and fut.exception()), None)
+        if failed is None:
+            return [fut.result().get("secure_url") for fut in futures]
+
+        for fut in pending:
+            fut.cancel()
+        # Let uploads that were already on the wire finish so they can be cleaned up.
+        wait(pending)
+
+    stored = [
+        fut.result() for fut in futures
+        if not fut.cancelled() and fut.exception() is None
+    ]
+    _discard(stored)
+
+    failed_file = files[futures.index(failed)]
+    raise UploadBatchError(getattr(failed_file, "name", "file"), failed.exception())
+
+
+# ==========================================
+# SIGNED DIRECT-TO-CLOUDINARY UPLOADS
+# ==========================================
+
+def sign_direct_upload(folder, owner_id, **context):
+    """
+    Returns the fields a browser needs to POST one file straight to Cloudinary.
+
+    The signature pins the folder and a server-chosen public_id, so the browser
+    cannot write anywhere else. `token` carries the same scope (plus `context`)
+    and must come back to the confirm endpoint within DIRECT_UPLOAD_TTL seconds.
+    """
+    configure_cloudinary()
+    cfg = cloudinary.config()
+
+    full_folder = f"mycebu/{folder}"
+    params = {
+        "timestamp": int(time.time()),
+        "folder": full_folder,
+        "public_id": uuid.uuid4().hex,
+    }
+    fields = dict(params)
+    fields["signature"] = cloudinary.utils.api_sign_request(params, cfg.api_secret)
+    fields["api_key"] = cfg.api_key
+
+    token = signing.dumps({
+        "owner": str(owner_id),
+        "public_id": f"{full_folder}/{params['public_id']}",
+        **context,
+    }, salt=_DIRECT_UPLOAD_SALT)
+
+    return {
+        "upload_url": cloudinary.utils.cloudinary_api_url("upload", resource_type="auto"),
+        "fields": fields,
+        "token": token,
+        "expires_in": DIRECT_UPLOAD_TTL,
+    }
+
+
+def verify_direct_upload(token, result, owner_id):
+    """
+    Checks a Cloudinary upload response the browser relayed back to us.
+
+    `result` must hold public_id, version and signature exactly as Cloudinary
+    returned them. Returns the token payload (scope and context) when the
+    token is fresh, belongs to `owner_id`, and the response signature matches.
+    """
+    try:
+        data = signing.loads(token, salt=_DIRECT_UPLOAD_SALT, max_age=DIRECT_UPLOAD_TTL)
+    except signing.SignatureExpired:
+        raise DirectUploadError("Upload token expired")
+    except signing.BadSignature:
+        raise DirectUploadError("Invalid upload token")
+
+    if data.get("owner") != str(owner_id):
+        raise DirectUploadError("Upload token belongs to another user")
+
+    # Accounts in dynamic-folder mode return the bare id instead of folder/id.
+    public_id = result.get("public_id")
+    if public_id not in (data["public_id"], data["public_id"].rsplit("/", 1)[-1]):
+        raise DirectUploadError("Uploaded asset does not match the signed upload")
+
+    configure_cloudinary()
+    if not cloudinary.utils.verify_api_response_signature(public_id, result.get("version"), result.get("signature")):
+        raise DirectUploadError("Cloudinary response signature mismatch")
+
+    # The signature covers public_id and version only; make sure the URL points at that asset.
+    if f"/v{result.get('version')}/{public_id}" not in (result.get("secure_url") or ""):
+        raise DirectUploadError("Uploaded asset URL does not match the signed upload")
+
+    return data
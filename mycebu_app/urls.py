@@ -10,6 +10,9 @@ urlpatterns = [
     # User Profile (Move this to the top!)
     path('profile/', views.profile_view, name='user_profile'),
 
+    # Locally rendered initials avatars
+    path('avatars/<str:initials>.svg', views.avatar_initials_view, name='avatar_initials'),
+
     # API & Chatbot
     path('api/chat/send/', views.chat_send_view, name='api_chat_send'),
     path('api/chat/history/', views.chat_history_view, name='api_chat_history'),
@@ -17,9 +20,18 @@ urlpatterns = [
     path('api/services/', views.service_list_api, name='api_service_list'),
     path('api/directory/', views.directory_list_api, name='api_directory_list'),
     path('api/my-applications/', views.my_applications_api, name='my_applications_api'),
+    path('api/my-changes/', views.my_changes_view, name='my_changes'),
+    path('api/me/summary/', views.my_summary_view, name='my_summary'),
+    path('api/uploads/sign/', views.direct_upload_sign_view, name='api_direct_upload_sign'),
+    path('api/uploads/confirm/', views.direct_upload_confirm_view, name='api_direct_upload_confirm'),
 
     # Admin Actions
     path('admin-action/<str:action_type>/', views.admin_action_view, name='admin_action'),
+    path('api/admin/feed/', views.admin_feed_view, name='api_admin_feed'),
+    path('api/admin/analytics/', views.admin_analytics_view, name='api_admin_analytics'),
+    path('api/admin/complaints/<uuid:complaint_id>/similar/', views.admin_similar_complaints_view, name='api_admin_similar_complaints'),
+    path('api/admin/<str:table>/', views.admin_table_api, name='api_admin_table'),
+    path('api/admin/export/<str:table>.<str:fmt>', views.admin_export_view, name='api_admin_export'),
 
     # Service Applications
     path("apply/<str:service>/", views.apply_permit_view, name="apply_permit"),
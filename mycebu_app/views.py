@@ -1,5 +1,6 @@
 import os
 import uuid
+import hashlib
 import json
 import time
 import logging
@@ -9,20 +10,17 @@ import requests
 from pathlib import Path
 from datetime import datetime
 
-# Cloudinary Imports
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 
 # Django Imports
-from django.db import connection
-from django.db.models import Q, F
-from django.http import JsonResponse, HttpResponse
+from django.db import connection, transaction
+from django.db.models import Q, F, Max, Count
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.template import TemplateDoesNotExist
+from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.views.decorators.http import require_GET, require_POST
@@ -41,6 +39,38 @@ from .models import Complaint, Ordinance, ServiceApplication, Service, Official,
 
 # Try to import the Custom User model from 'accounts' app, fallback to 'mycebu_app' if not found
 from accounts.models import User as DbUser
+
+# Cloudinary upload helpers
+from .uploads import (
+    upload_to_cloudinary, upload_many_to_cloudinary, UploadBatchError,
+    sign_direct_upload, verify_direct_upload, DirectUploadError,
+)
+from .upload_handlers import StreamingStorageUploadHandler
+from .ordinances import category_previews, ordinance_overview, ordinance_facets, ORDINANCE_SORTS, ORDINANCE_RELEVANCE
+from .pagination import keyset_page, Key
+from .admin_tables import admin_table_page, ADMIN_TABLES
+from .stats import get_admin_stats
+from .status_updates import update_returning, set_status, BULK_UPDATE_LIMIT
+from .exports import export_stream, ExportError, EXPORTS, EXPORT_FORMATS
+from .analytics import complaint_analytics, AnalyticsError
+from .duplicates import index_complaint, find_similar
+from .idempotency import idempotent
+from .summaries import get_user_summary
+from .feed import has_changes, poll_changes, render_admin_changes, latest_event_id, parse_event_id
+from .search import search_ordinances, highlight, best_passage
+from .ordinance_text import spool_to_tempfile, schedule_ordinance_indexing, discard_spooled
+from .directory import search_officials, directory_facets, get_directory_snapshot, negotiate_encoding
+from .avatars import (
+    AVATAR_SIZES, AVATAR_MAIN_SIZE, AVATAR_THUMB_SIZE,
+    normalize_avatar, avatar_public_ids, avatar_variant_url,
+    initials_for, initials_avatar_url, valid_initials, initials_svg,
+)
+
+# Permit documents are streamed to storage and cut off past this size
+PERMIT_MAX_UPLOAD_SIZE = 15 * 1024 * 1024
+
+VALID_COMPLAINT_STATUSES = ['Pending', 'In Progress', 'Resolved', 'Cancelled']
+VALID_PERMIT_STATUSES = ['draft', 'pending', 'submitted', 'verified', 'rejected']
 # ==========================================
 # SETUP & LOGGING
 # ==========================================
@@ -57,27 +87,6 @@ try:
 except Exception as e:
     logger.error(f"Failed to configure Gemini: {e}")
 # ==========================================
-# CLOUDINARY UPLOAD HELPER
-# ==========================================
-def upload_to_cloudinary(file_obj, folder="profiles"):
-    """
-    Uploads a file object to Cloudinary.
-    """
-    cloudinary.config(
-        cloud_name=settings.CLOUDINARY_STORAGE['CLOUD_NAME'],
-        api_key=settings.CLOUDINARY_STORAGE['API_KEY'],
-        api_secret=settings.CLOUDINARY_STORAGE['API_SECRET']
-    )
-    
-    upload_result = cloudinary.uploader.upload(
-        file_obj,
-        folder=f"mycebu/{folder}",
-        resource_type="auto"
-    )
-    
-    return upload_result.get("secure_url")
-
-# ==========================================
 # AUTH & USER HELPERS
 # ==========================================
 
@@ -129,9 +138,12 @@ def get_authed_user(request):
     if not display_name:
         display_name = auth_user.username
 
-    avatar_url = f"https://ui-avatars.com/api/?name={auth_user.username}&background=random"
+    # Initials avatar is rendered by us (see avatar_initials_view); no third-party fetch
+    avatar_url = initials_avatar_url(initials_for(auth_user.first_name, auth_user.last_name, auth_user.username))
+    avatar_thumb_url = avatar_url
     if db_user.avatar_url:
         avatar_url = db_user.avatar_url
+        avatar_thumb_url = avatar_variant_url(db_user.avatar_url, AVATAR_THUMB_SIZE)
 
     return {
         "id": user_id,
@@ -141,6 +153,7 @@ def get_authed_user(request):
         "last_name": auth_user.last_name,
         "display_name": display_name,
         "avatar_url": avatar_url,
+        "avatar_thumb_url": avatar_thumb_url,
         "role": db_user.role,
         "middle_name": db_user.middle_name,
         "age": db_user.age,
@@ -154,6 +167,15 @@ def get_authed_user(request):
         "city": db_user.city,
     }
 
+@require_GET
+def avatar_initials_view(request, initials):
+    """Initials avatar as SVG. Content depends only on the URL, so it is cached for a year."""
+    if not valid_initials(initials) or initials != initials.upper():
+        return HttpResponse(status=404)
+    response = HttpResponse(initials_svg(initials), content_type="image/svg+xml")
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 def _get_service_by_id(service_id):
     """Helper to fetch a specific service from DB by its string ID (e.g., 'business-permit')"""
     return Service.objects.filter(service_id=service_id).first()
@@ -201,38 +223,9 @@ def landing_view(request, tab='landing'):
     # ADMIN DASHBOARD TAB
     # ==========================
     if tab == 'admin_dashboard':
-        total_complaints = Complaint.objects.count()
-        pending_complaints = Complaint.objects.filter(status='Submitted').count()
-        
-        try:
-            total_users = DbUser.objects.count()
-            all_users = DbUser.objects.all().order_by('-created_at')
-        except:
-            total_users = 0
-            all_users = []
-
-        all_complaints = Complaint.objects.all().order_by('-created_at')
-        services_list = Service.objects.all().order_by('title')
-        officials_list = Official.objects.all().order_by('name')
-        ordinances_list = Ordinance.objects.all().order_by('-created_at')
-        
-        # NEW: Get all permit applications
-        all_permits = ServiceApplication.objects.all().order_by('-created_at')
-        pending_permits = ServiceApplication.objects.filter(document_status='pending').count()
-
+        # Only the stats header is rendered here; each tab loads its rows from admin_table_api
         context.update({
-            "admin_stats": {
-                "total_complaints": total_complaints,
-                "pending_complaints": pending_complaints,
-                "total_users": total_users,
-                "pending_permits": pending_permits  # NEW
-            },
-            "admin_complaints": all_complaints,
-            "admin_services": services_list, 
-            "admin_officials": officials_list,
-            "admin_ordinances": ordinances_list,
-            "admin_users": all_users,
-            "admin_permits": all_permits,  # NEW
+            "admin_stats": get_admin_stats(),
         })
 
     # ==========================
@@ -306,29 +299,20 @@ def landing_view(request, tab='landing'):
     # DIRECTORY TAB
     # ==========================
     elif tab == 'directory':
-        officials_all = Official.objects.all().order_by('name')
         department_offices = Department.objects.all().order_by('name')
         emergency_contacts = EmergencyContact.objects.all()
-        
-        positions = sorted(list(set(Official.objects.values_list('position', flat=True))))
-        districts = sorted(list(set(Official.objects.exclude(district__isnull=True).exclude(district="").values_list('district', flat=True))))
+
+        # Cached under the directory data version, so every write shows up on commit
+        facets = directory_facets()
 
         q = (request.GET.get("q", "") or "").lower()
         position_filter = request.GET.get("position", "all")
         district_filter = request.GET.get("district", "all")
 
-        officials_filtered = []
-        for o in officials_all:
-            name_pos = f"{o.name} {o.position}".lower()
-            if q and q not in name_pos: continue
-            if position_filter != "all" and o.position != position_filter: continue
-            if district_filter != "all" and o.district != district_filter: continue
-            officials_filtered.append(o)
-
         context.update({
-            "officials": officials_filtered,
-            "positions": positions,
-            "districts": districts,
+            "officials": search_officials(q, position_filter, district_filter),
+            "positions": [f["value"] for f in facets["positions"]],
+            "districts": [f["value"] for f in facets["districts"]],
             "department_offices": department_offices,
             "emergency_contacts": emergency_contacts,
             "q": q,
@@ -344,16 +328,12 @@ def landing_view(request, tab='landing'):
         category_filter = request.GET.get("category", "")
         author_filter = request.GET.get("author", "")
         view_all = request.GET.get("view_all", "").strip()
-        page = request.GET.get("page", 1)
 
         qs = Ordinance.objects.all().order_by('name_or_ordinance')
 
         if query:
-            qs = qs.filter(
-                Q(name_or_ordinance__icontains=query) |
-                Q(author__icontains=query) |
-                Q(ordinance_number__icontains=query)
-            )
+            # Ordered by relevance unless a sort is picked below
+            qs = search_ordinances(qs, query)
 
         if category_filter:
             qs = qs.filter(category=category_filter)
@@ -364,46 +344,38 @@ def landing_view(request, tab='landing'):
         if view_all:
             qs = qs.filter(category=view_all)
             sort = request.GET.get("sort", "")
-            if sort == 'newest':
-                qs = qs.order_by(F('date_of_enactment').desc(nulls_last=True))
-            elif sort == 'oldest':
-                qs = qs.order_by(F('date_of_enactment').asc(nulls_last=True))
-            elif sort == 'year':
-                qs = qs.order_by(F('date_of_enactment__year').desc(nulls_last=True), F('date_of_enactment').desc(nulls_last=True))
-            
-            paginator = Paginator(qs, 9)
-            ordinances_page = paginator.get_page(page)
-            ordinances_data = list(ordinances_page.object_list.values())
+            ordering = ORDINANCE_SORTS.get(sort) or (ORDINANCE_RELEVANCE if query else ORDINANCE_SORTS[""])
+            ordinances_page = keyset_page(qs, ordering, request.GET.get("cursor"), per_page=9)
+            ordinances_data = ordinances_page.items
 
             context.update({
                 "ordinances_data": ordinances_data,
                 "view_all": view_all,
-                "paginator": paginator,
                 "page_obj": ordinances_page,
-                "is_paginated": paginator.num_pages > 1,
+                "is_paginated": ordinances_page.has_next or ordinances_page.has_previous,
             })
         else:
-            all_ordinances = list(qs.values())
-            categories = defaultdict(list)
-            for ord in all_ordinances:
-                cat = ord['category'] or 'General'
-                if len(categories[cat]) < 3:
-                    categories[cat].append(ord)
-            ordinances_data = []
-            for cat, ords in categories.items():
-                ordinances_data.extend(ords)
+            if query or category_filter or author_filter:
+                ordinances_data = category_previews(qs, ranked=bool(query))
+            else:
+                ordinances_data = ordinance_overview()
 
             context.update({
                 "ordinances_data": ordinances_data,
                 "view_all": None,
             })
 
-        categories_list = sorted(list(Ordinance.objects.exclude(category__isnull=True).values_list('category', flat=True).distinct()))
-        authors_list = sorted(list(Ordinance.objects.exclude(author__isnull=True).values_list('author', flat=True).distinct()))
+        if query:
+            for ord in ordinances_data:
+                ord['title_html'] = highlight(ord['name_or_ordinance'], query)
+
+        facets = ordinance_facets()
 
         context.update({
-            "categories_list": categories_list,
-            "authors_list": authors_list,
+            "categories_list": [f["value"] for f in facets["categories"]],
+            "authors_list": [f["value"] for f in facets["authors"]],
+            "category_facets": facets["categories"],
+            "author_facets": facets["authors"],
         })
 
     try:
@@ -415,6 +387,120 @@ def landing_view(request, tab='landing'):
 # ADMIN ACTIONS (DB CONNECTED)
 # ==========================================
 
+@require_GET
+def admin_table_api(request, table):
+    """
+    One page of an admin dashboard table (see admin_tables.ADMIN_TABLES).
+    Query params: q, sort, cursor, limit, plus the table's filters.
+    """
+    user = get_authed_user(request)
+    if not user or user.get('role') != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+    if table not in ADMIN_TABLES:
+        return JsonResponse({'success': False, 'error': 'Unknown table'}, status=404)
+
+    try:
+        return JsonResponse({'success': True, **admin_table_page(table, request.GET)})
+    except Exception as e:
+        logger.error(f"admin_table_api ({table}) error: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+@require_GET
+def admin_export_view(request, table, fmt):
+    """
+    Streams a table as CSV or NDJSON (see exports.EXPORTS).
+    Query params: from / to (YYYY-MM-DD, on created_at) and status (comma-separated).
+    """
+    user = get_authed_user(request)
+    if not user or user.get('role') != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+    if table not in EXPORTS or fmt not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Unknown export'}, status=404)
+
+    try:
+        rows = export_stream(table, fmt, request.GET)
+    except ExportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(rows, content_type=EXPORT_FORMATS[fmt])
+    filename = f"{table}-{timezone.localdate().isoformat()}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+@require_GET
+def admin_analytics_view(request):
+    """
+    Complaint counts from the daily rollups (see analytics.py).
+    Query params: from / to (YYYY-MM-DD), group (day, week, month, category,
+    subcategory, location, status; comma-separated) and the filters category,
+    subcategory, status and location.
+    """
+    user = get_authed_user(request)
+    if not user or user.get('role') != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        return JsonResponse({'success': True, **complaint_analytics(request.GET)})
+    except AnalyticsError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"admin_analytics_view error: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+# Columns of each complaint in the similar-complaints panel
+SIMILAR_COMPLAINT_FIELDS = ["id", "subject", "location", "category", "status", "created_at", "duplicate_of"]
+
+@require_GET
+def admin_similar_complaints_view(request, complaint_id):
+    """
+    Complaints whose text is near-identical to this one, best first, with the
+    estimated similarity as `score` (see duplicates.py).
+    """
+    user = get_authed_user(request)
+    if not user or user.get('role') != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    try:
+        similar = find_similar(complaint_id)
+    except Complaint.DoesNotExist:
+        return JsonResponse({'success': False, 'error': 'Complaint not found'}, status=404)
+    except Exception as e:
+        logger.error(f"admin_similar_complaints_view error: {str(e)}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+    rows = {row['id']: row for row in Complaint.objects.filter(pk__in=[pk for pk, _ in similar]).values(*SIMILAR_COMPLAINT_FIELDS)}
+    items = [{**rows[pk], 'score': round(score, 2)} for pk, score in similar if pk in rows]
+    return JsonResponse({'success': True, 'items': items})
+
+def feed_poll_response(after, render, user_id=None):
+    """
+    The answer to a feed poll after event id `after` (see feed.py): 204 when
+    nothing changed, else the changes, the cursor to poll from next and
+    whether the client should poll again straight away.
+    """
+    if not has_changes(after, user_id):
+        return HttpResponse(status=204)
+    messages, cursor, more = poll_changes(after, render, user_id)
+    changes = [{'kind': kind, **data} for kind, data in messages]
+    return JsonResponse({'success': True, 'changes': changes, 'cursor': cursor, 'more': more})
+
+@require_GET
+def admin_feed_view(request):
+    """
+    New and changed complaints and permits after ?since= (see feed.py), polled
+    by the admin dashboard while it is visible. Without since, only the cursor
+    of the latest change to poll from.
+    """
+    user = get_authed_user(request)
+    if not user or user.get('role') != 'admin':
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
+
+    after = parse_event_id(request.GET.get('since'))
+    if after is None:
+        return JsonResponse({'success': True, 'changes': [], 'cursor': latest_event_id(), 'more': False})
+    return feed_poll_response(after, render_admin_changes)
+
 @csrf_exempt
 @require_POST
 def admin_action_view(request, action_type):
@@ -506,18 +592,32 @@ def admin_action_view(request, action_type):
             # Ordinances involve files, so likely FormData (request.POST/FILES)
             data = request.POST
             pdf_url = ""
-            if 'pdf_file' in request.FILES:
-                pdf_url = upload_to_cloudinary(request.FILES['pdf_file'], folder="ordinances")
-            
-            ordinance = Ordinance.objects.create(
-                category=data.get('category', 'General'),
-                ordinance_number=data.get('ordinance_number', ''),
-                name_or_ordinance=data.get('title', ''),
-                author=data.get('author', ''),
-                date_of_enactment=data.get('date_enacted') or None,
-                pdf_file_path=pdf_url,
-                created_at=timezone.now()
-            )
+            pdf_path = None
+            try:
+                with transaction.atomic():
+                    if 'pdf_file' in request.FILES:
+                        pdf_file = request.FILES['pdf_file']
+                        # Local copy for text indexing; the upload itself goes to Cloudinary as before
+                        pdf_path = spool_to_tempfile(pdf_file.chunks())
+                        pdf_file.seek(0)
+                        pdf_url = upload_to_cloudinary(pdf_file, folder="ordinances")
+
+                    ordinance = Ordinance.objects.create(
+                        category=data.get('category', 'General'),
+                        ordinance_number=data.get('ordinance_number', ''),
+                        name_or_ordinance=data.get('title', ''),
+                        author=data.get('author', ''),
+                        date_of_enactment=data.get('date_enacted') or None,
+                        pdf_file_path=pdf_url,
+                        created_at=timezone.now()
+                    )
+                    if pdf_path:
+                        schedule_ordinance_indexing(ordinance.id, pdf_path)
+            except Exception:
+                # Anything before the commit: the indexer never got the file, so it's ours to remove
+                if pdf_path:
+                    discard_spooled(pdf_path)
+                raise
             return JsonResponse({'success': True, 'new_id': str(ordinance.id)})
 
         elif action_type == 'delete_ordinance':
@@ -550,15 +650,17 @@ def admin_action_view(request, action_type):
             new_status = data['status']
             
             # Optional: Add validation for new statuses
-            VALID_COMPLAINT_STATUSES = ['Pending', 'In Progress', 'Resolved', 'Cancelled']
             if new_status not in VALID_COMPLAINT_STATUSES:
                 return JsonResponse({'success': False, 'error': f'Invalid status: {new_status}'}, status=400)
 
-            Complaint.objects.filter(id=data['id']).update(
+            updated = update_returning(
+                Complaint.objects.filter(id=data['id']), ['status', 'updated_at'],
                 status=new_status,
                 updated_at=timezone.now()
             )
-            return JsonResponse({'success': True})
+            if not updated:
+                return JsonResponse({'success': False, 'error': 'Complaint not found'}, status=404)
+            return JsonResponse({'success': True, 'complaint': updated[0]})
         
         # NEW: Update Permit Status
         elif action_type == 'update_permit_status':
@@ -566,23 +668,87 @@ def admin_action_view(request, action_type):
             permit_id = data.get('id')
             new_status = data.get('document_status')
             admin_notes = data.get('admin_notes', '')
-            
-            try:
-                permit = ServiceApplication.objects.get(id=permit_id)
-                permit.document_status = new_status
-                permit.admin_notes = admin_notes
-                permit.updated_at = timezone.now()
-                
-                if new_status == 'verified':
-                    permit.completed_at = timezone.now()
-                
-                permit.save()
-                return JsonResponse({'success': True})
-            except ServiceApplication.DoesNotExist:
+
+            if new_status not in VALID_PERMIT_STATUSES:
+                return JsonResponse({'success': False, 'error': f'Invalid status: {new_status}'}, status=400)
+
+            now = timezone.now()
+            changes = {'document_status': new_status, 'admin_notes': admin_notes, 'updated_at': now}
+            if new_status == 'verified':
+                changes['completed_at'] = now
+
+            updated = update_returning(
+                ServiceApplication.objects.filter(id=permit_id),
+                ['document_status', 'admin_notes', 'updated_at', 'completed_at'],
+                **changes
+            )
+            if not updated:
                 return JsonResponse({'success': False, 'error': 'Permit application not found'}, status=404)
+            return JsonResponse({'success': True, 'permit': updated[0]})
+
+        # Bulk triage: one set-based UPDATE for a list of ids
+        elif action_type == 'bulk_update_complaints':
+            data = json.loads(request.body)
+            ids = data.get('ids') or []
+            new_status = data.get('status')
+
+            if new_status not in VALID_COMPLAINT_STATUSES:
+                return JsonResponse({'success': False, 'error': f'Invalid status: {new_status}'}, status=400)
+            if not isinstance(ids, list) or len(ids) > BULK_UPDATE_LIMIT:
+                return JsonResponse({'success': False, 'error': f'ids must be a list of at most {BULK_UPDATE_LIMIT}'}, status=400)
+
+            changed = set_status(Complaint, ids, 'status', new_status, updated_at=timezone.now())
+            return JsonResponse({'success': True, 'updated': [str(pk) for pk in changed]})
+
+        elif action_type == 'bulk_update_permits':
+            data = json.loads(request.body)
+            ids = data.get('ids') or []
+            new_status = data.get('document_status')
+
+            if new_status not in VALID_PERMIT_STATUSES:
+                return JsonResponse({'success': False, 'error': f'Invalid status: {new_status}'}, status=400)
+            if not isinstance(ids, list) or len(ids) > BULK_UPDATE_LIMIT:
+                return JsonResponse({'success': False, 'error': f'ids must be a list of at most {BULK_UPDATE_LIMIT}'}, status=400)
+
+            now = timezone.now()
+            extra = {'updated_at': now}
+            if new_status == 'verified':
+                extra['completed_at'] = now
+            if data.get('admin_notes'):
+                extra['admin_notes'] = data['admin_notes']
+
+            changed = set_status(ServiceApplication, ids, 'document_status', new_status, **extra)
+            return JsonResponse({'success': True, 'updated': [str(pk) for pk in changed]})
+
+        # Duplicates: point the copies (and their own copies) at the kept complaint. Their status is
+        # left alone; closing a duplicate is still an explicit status change.
+        elif action_type == 'merge_complaints':
+            data = json.loads(request.body)
+            ids = data.get('ids') or []
+
+            if not isinstance(ids, list) or len(ids) > BULK_UPDATE_LIMIT:
+                return JsonResponse({'success': False, 'error': f'ids must be a list of at most {BULK_UPDATE_LIMIT}'}, status=400)
+            primary = Complaint.objects.filter(id=data.get('primary')).values('id', 'duplicate_of').first()
+            if not primary:
+                return JsonResponse({'success': False, 'error': 'Complaint not found'}, status=404)
+            # Merging into a complaint that was itself merged goes to the one it was merged into
+            target = primary['duplicate_of'] or primary['id']
+
+            with transaction.atomic():
+                merged = update_returning(
+                    Complaint.objects.filter(id__in=ids).exclude(id=target), ['pk'],
+                    duplicate_of=target,
+                    updated_at=timezone.now()
+                )
+                merged = [row['pk'] for row in merged]
+                if merged:
+                    Complaint.objects.filter(duplicate_of__in=merged).update(duplicate_of=target, updated_at=timezone.now())
+            return JsonResponse({'success': True, 'primary': str(target), 'merged': [str(pk) for pk in merged]})
 
         return JsonResponse({'success': False, 'error': 'Invalid action'}, status=400)
 
+    except ValidationError as e:
+        return JsonResponse({'success': False, 'error': f'Invalid id: {e.messages[0]}'}, status=400)
     except Service.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Service not found'}, status=404)
     except Official.DoesNotExist:
@@ -664,11 +830,15 @@ def profile_view(request):
                 except ValueError:
                     pass # Keep old date if format is wrong
 
-            # Handle Avatar Upload
+            # Handle Avatar Upload: store small fixed-size WebP thumbnails, never the original
             if "avatar" in request.FILES:
-                file = request.FILES["avatar"]
-                # Assuming upload_to_cloudinary is imported
-                url = upload_to_cloudinary(file, folder=f"profiles/{auth_user.id}")
+                thumbs = normalize_avatar(request.FILES["avatar"])
+                urls = upload_many_to_cloudinary(
+                    thumbs,
+                    folder=f"profiles/{auth_user.id}",
+                    public_ids=avatar_public_ids(uuid.uuid4().hex),
+                )
+                url = urls[AVATAR_SIZES.index(AVATAR_MAIN_SIZE)]
                 if url:
                     db_user.avatar_url = url
 
@@ -840,6 +1010,7 @@ def update_service_application(request, service: str, app_id):
 
 @csrf_exempt
 @require_POST
+@idempotent
 def upload_permit_document(request, service: str, app_id):
     user = get_authed_user(request)
     if not user:
@@ -850,23 +1021,36 @@ def upload_permit_document(request, service: str, app_id):
     except ServiceApplication.DoesNotExist:
         return JsonResponse({"success": False, "error": "App not found"}, status=404)
 
-    if 'document' not in request.FILES:
+    # Stream the document straight to storage while the body is parsed; any
+    # other file field goes on to the default handlers.
+    # Must be installed before request.FILES is touched.
+    handler = StreamingStorageUploadHandler(
+        request,
+        folder=f"permits/{service}/{app_id}",
+        fields=("document",),
+        max_size=PERMIT_MAX_UPLOAD_SIZE,
+    )
+    request.upload_handlers.insert(0, handler)
+
+    try:
+        has_document = 'document' in request.FILES
+    except Exception as e:
+        logger.error(f"Upload failed: {e}")
+        return JsonResponse({"success": False, "error": "Server error"}, status=500)
+
+    if handler.rejected:
+        if handler.rejected["reason"] == "too_large":
+            return JsonResponse({"success": False, "error": "File too big"}, status=400)
+        return JsonResponse({"success": False, "error": "Server error"}, status=500)
+
+    if not has_document:
         return JsonResponse({"success": False, "error": "No file"}, status=400)
 
     file = request.FILES['document']
 
-    if file.size > 15 * 1024 * 1024:
-        return JsonResponse({"success": False, "error": "File too big"}, status=400)
-
     try:
-        url = upload_to_cloudinary(file, folder=f"permits/{service}/{app_id}")
-        
-        # THIS IS THE KEY FIX
-        app.document_url = url
-        app.document_status = "pending"   # ← THIS TRIGGERS YOUR TEMPLATE SUCCESS BOX
-        app.progress = 100
-        app.completed_at = timezone.now()
-        app.save()
+        url = file.url
+        _record_permit_document(app, url)
 
         return JsonResponse({
             "success": True,
@@ -877,6 +1061,109 @@ def upload_permit_document(request, service: str, app_id):
         logger.error(f"Upload failed: {e}")
         return JsonResponse({"success": False, "error": "Server error"}, status=500)
 
+def _record_permit_document(app, url):
+    """Marks an application as submitted once its document is in storage."""
+    app.document_url = url
+    app.document_status = "pending"   # ← THIS TRIGGERS YOUR TEMPLATE SUCCESS BOX
+    app.progress = 100
+    app.completed_at = timezone.now()
+    app.save()
+
+# ==========================================
+# DIRECT UPLOADS (browser → Cloudinary, signed by us)
+# ==========================================
+
+@csrf_exempt
+@require_POST
+def direct_upload_sign_view(request):
+    """
+    Issues short-lived signed upload fields for one file.
+    Body: {"purpose": "permit", "service": ..., "app_id": ...} or {"purpose": "complaint"}
+    """
+    user = get_authed_user(request)
+    if not user:
+        return JsonResponse({"success": False, "error": "Login required"}, status=401)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"success": False, "error": "Invalid JSON body"}, status=400)
+
+    purpose = data.get("purpose")
+
+    if purpose == "permit":
+        service = data.get("service") or ""
+        app_id = data.get("app_id") or ""
+        try:
+            ServiceApplication.objects.only("id").get(id=app_id, user_id=user["id"], service_type=service)
+        except (ServiceApplication.DoesNotExist, ValueError, ValidationError):
+            return JsonResponse({"success": False, "error": "Application not found"}, status=404)
+        folder = f"permits/{service}/{app_id}"
+        context = {"purpose": purpose, "app_id": str(app_id)}
+
+    elif purpose == "complaint":
+        folder = f"complaints/{user['id']}"
+        context = {"purpose": purpose}
+
+    else:
+        return JsonResponse({"success": False, "error": "Unknown upload purpose"}, status=400)
+
+    try:
+        signed = sign_direct_upload(folder, user["id"], **context)
+    except Exception as e:
+        logger.error(f"direct_upload_sign_view: {e}")
+        return JsonResponse({"success": False, "error": "Server error"}, status=500)
+
+    return JsonResponse({"success": True, **signed})
+
+@csrf_exempt
+@require_POST
+def direct_upload_confirm_view(request):
+    """
+    Records a finished direct upload.
+    Body: {"token": ..., "result": <Cloudinary upload response>, "name": ..., "content_type": ...}
+    """
+    user = get_authed_user(request)
+    if not user:
+        return JsonResponse({"success": False, "error": "Login required"}, status=401)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"success": False, "error": "Invalid JSON body"}, status=400)
+
+    result = data.get("result") or {}
+    try:
+        scope = verify_direct_upload(data.get("token") or "", result, user["id"])
+    except DirectUploadError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    url = result["secure_url"]
+
+    if scope["purpose"] == "permit":
+        try:
+            app = ServiceApplication.objects.get(id=scope["app_id"], user_id=user["id"])
+        except ServiceApplication.DoesNotExist:
+            return JsonResponse({"success": False, "error": "App not found"}, status=404)
+        _record_permit_document(app, url)
+        return JsonResponse({
+            "success": True,
+            "message": "Application submitted!",
+            "document_url": url
+        })
+
+    # Complaints don't exist yet while files upload; hand back the attachment
+    # entry for the client to include in its submit payload.
+    return JsonResponse({
+        "success": True,
+        "attachment": {
+            "name": data.get("name") or result.get("original_filename") or "file",
+            "url": url,
+            "size": result.get("bytes"),
+            "content_type": data.get("content_type"),
+        }
+    })
+
 def permit_progress_view(request, service: str, app_id):
     user = get_authed_user(request)
     if not user:
@@ -941,6 +1228,7 @@ def permit_progress_view(request, service: str, app_id):
 
 @csrf_exempt
 @require_POST
+@idempotent
 def submit_complaint_view(request):
     user = get_authed_user(request)
     if not user or not user.get("id"):
@@ -968,8 +1256,13 @@ def submit_complaint_view(request):
         if not attachments:
             files = request.FILES.getlist("cmp-files") or request.FILES.getlist("attachments")
             attachments = []
-            for f in files:
-                uploaded_url = upload_to_cloudinary(f, folder=f"complaints/{user['id']}")
+            try:
+                uploaded_urls = upload_many_to_cloudinary(files, folder=f"complaints/{user['id']}")
+            except UploadBatchError as e:
+                logger.error(f"submit_complaint_view upload error: {e}")
+                return JsonResponse({"success": False, "error": f"Could not upload {e.file_name}. Please try again."}, status=502)
+
+            for f, uploaded_url in zip(files, uploaded_urls):
                 if uploaded_url:
                     attachments.append({
                         "name": f.name,
@@ -1005,6 +1298,11 @@ def submit_complaint_view(request):
             created_at=timezone.now(),
             updated_at=timezone.now()
         )
+        try:
+            index_complaint(complaint)
+        except Exception as e:
+            # The complaint stands; backfill_complaint_signatures indexes it later
+            logger.error(f"submit_complaint_view duplicate index error: {str(e)}")
 
         return JsonResponse({
             "success": True,
@@ -1020,17 +1318,59 @@ def submit_complaint_view(request):
         logger.error(f"submit_complaint_view error: {str(e)}")
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
+# Columns of a citizen's complaint list (also sent by /api/my-changes/)
+COMPLAINT_LIST_FIELDS = ["id", "category", "subcategory", "subject", "status", "created_at", "location"]
+# Further columns a client may ask for with ?fields=
+COMPLAINT_EXTRA_FIELDS = ["updated_at", "description", "is_anonymous"]
+COMPLAINT_PAGE_SIZE = 20
+COMPLAINT_MAX_PAGE_SIZE = 100
+COMPLAINT_LIST_ORDER = [Key("created_at", descending=True), Key("id", descending=True)]
+
 @require_GET
 def list_complaints_view(request):
+    """
+    The user's complaints, newest first, one keyset page at a time.
+    Query params: cursor (next_cursor of the previous page), limit, and
+    fields (comma-separated columns; id is always sent). The ETag changes
+    whenever one of the user's complaints is added, edited or removed.
+    """
     user = get_authed_user(request)
     if not user or not user.get("id"):
         return JsonResponse({"success": False, "error": "Not authenticated"}, status=401)
 
+    requested = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()]
+    unknown = [f for f in requested if f not in COMPLAINT_LIST_FIELDS + COMPLAINT_EXTRA_FIELDS]
+    if unknown:
+        return JsonResponse({"success": False, "error": f"Unknown fields: {', '.join(unknown)}"}, status=400)
+    fields = list(dict.fromkeys(["id"] + requested)) if requested else COMPLAINT_LIST_FIELDS
+
     try:
-        complaints = Complaint.objects.filter(user_id=user["id"]).order_by('-created_at').values(
-            "id", "category", "subcategory", "subject", "status", "created_at", "location"
-        )
-        return JsonResponse({"success": True, "items": list(complaints)})
+        limit = int(request.GET.get("limit") or COMPLAINT_PAGE_SIZE)
+    except ValueError:
+        limit = COMPLAINT_PAGE_SIZE
+    limit = max(1, min(limit, COMPLAINT_MAX_PAGE_SIZE))
+
+    try:
+        mine = Complaint.objects.filter(user_id=user["id"])
+        state = mine.aggregate(latest=Max("updated_at"), total=Count("id"))
+        version = f"{state['latest']}|{state['total']}|{request.GET.urlencode()}"
+        etag = '"' + hashlib.sha1(version.encode()).hexdigest()[:16] + '"'
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponse(status=304)
+        else:
+            changes_since = latest_event_id()
+            page = keyset_page(mine, COMPLAINT_LIST_ORDER, request.GET.get("cursor"),
+                               per_page=limit, fields=fields, with_total=False)
+            response = JsonResponse({
+                "success": True,
+                "items": [{f: row[f] for f in fields} for row in page.items],
+                "next_cursor": page.next_cursor,
+                "total": state["total"],
+                "changes_since": changes_since,
+            })
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
     except Exception as e:
         logger.error(f"list_complaints_view: {str(e)}")
         return JsonResponse({"success": False, "error": str(e)}, status=500)
@@ -1085,23 +1425,17 @@ def update_complaint_status_view(request, complaint_id):
         return JsonResponse({"success": False, "error": "Status is required"}, status=400)
 
     try:
-        updated_count = Complaint.objects.filter(id=complaint_id, user_id=user["id"]).update(
+        # The owner filter is the guard: a complaint that isn't theirs updates nothing
+        updated = update_returning(
+            Complaint.objects.filter(id=complaint_id, user_id=user["id"]),
+            ["id", "status", "updated_at"],
             status=new_status,
             updated_at=timezone.now()
         )
-
-        if updated_count == 0:
+        if not updated:
             return JsonResponse({"success": False, "error": "Complaint not found or not owned by user"}, status=404)
 
-        c = Complaint.objects.get(id=complaint_id)
-        return JsonResponse({
-            "success": True,
-            "complaint": {
-                "id": c.id,
-                "status": c.status,
-                "updated_at": c.updated_at,
-            }
-        })
+        return JsonResponse({"success": True, "complaint": updated[0]})
     except Exception as e:
         logger.error(f"update_complaint_status_view: {str(e)}")
         return JsonResponse({"success": False, "error": str(e)}, status=500)
@@ -1131,73 +1465,23 @@ def service_list_api(request):
 @require_GET
 def directory_list_api(request):
     try:
-        # 1. Officials
-        officials_qs = Official.objects.all().order_by('name')
-        officials_data = []
-        positions = set()
-        districts = set()
-
-        for o in officials_qs:
-            # Handle potential None values safely
-            pos = o.position or "Official"
-            dist = o.district or ""
-            
-            if pos: positions.add(pos)
-            if dist: districts.add(dist)
-
-            officials_data.append({
-                "id": str(o.id),
-                "name": o.name or "Unknown Name",
-                "position": pos,
-                "office": o.office or "",
-                "district": dist,
-                # IMPORTANT: Return empty string if no photo, never None
-                "photo": o.photo if o.photo else None, 
-                "initials": o.initials or (o.name[:2].upper() if o.name else "??"),
-                "email": o.email or None,
-                "phone": o.phone or None
-            })
-
-        # 2. Departments
-        dept_qs = Department.objects.all().order_by('name')
-        dept_data = []
-        for d in dept_qs:
-            # Ensure contact_details is a dictionary
-            contacts = d.contact_details if isinstance(d.contact_details, dict) else {}
-            dept_data.append({
-                "id": str(d.id),
-                "name": d.name or "Unnamed Office",
-                "head": d.head or "",
-                "emails": contacts.get('emails', []) if contacts else [],
-                "phones": contacts.get('phones', []) if contacts else []
-            })
-
-        # 3. Hotlines
-        hotline_qs = EmergencyContact.objects.all().order_by('service')
-        hotline_data = []
-        for h in hotline_qs:
-            # Ensure numbers is a list
-            nums = h.numbers if isinstance(h.numbers, list) else [h.numbers] if h.numbers else []
-            hotline_data.append({
-                "id": str(h.id),
-                "service": h.service or "Service",
-                "numbers": nums
-            })
-
-        return JsonResponse({
-            "success": True,
-            "officials": officials_data,
-            "offices": dept_data,
-            "hotlines": hotline_data,
-            "filters": {
-                "positions": sorted(list(positions)),
-                "districts": sorted(list(districts))
-            }
-        })
-
+        snapshot = get_directory_snapshot()
     except Exception as e:
-        print(f"API Error: {e}") 
+        logger.error(f"Directory API error: {e}")
         return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"), snapshot["bodies"])
+    etag = f'"{snapshot["etag"]}-{encoding}"'
+
+    if snapshot["etag"] in request.headers.get("If-None-Match", ""):
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(snapshot["bodies"][encoding], content_type="application/json")
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    return response
     
 @csrf_exempt
 @require_POST
@@ -1291,9 +1575,12 @@ def chat_send_view(request):
             context_data.append(f"[DB: Official] {o.name} ({o.position}) - {o.office}")
 
         if 'ordinance' in search_query or 'law' in search_query:
-            ordinances = Ordinance.objects.filter(name_or_ordinance__icontains=search_query)[:3]
+            ordinances = search_ordinances(Ordinance.objects.all(), search_query, match="any")[:3]
             for o in ordinances:
                 context_data.append(f"[DB: Ordinance] {o.ordinance_number} - {o.name_or_ordinance}")
+                passage = best_passage(o.id, search_query)
+                if passage:
+                    context_data.append(f"  Excerpt (page {passage.page}): {passage.text}")
 
         if any(x in search_query for x in ['emergency', 'hotline', 'police', 'fire']):
             emergencies = EmergencyContact.objects.all()
@@ -1385,37 +1672,83 @@ def chat_session_detail_view(request, conversation_id):
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
     
+def serialize_applications(apps):
+    """The /api/my-applications/ shape for ServiceApplication rows, with one query for the service titles."""
+    titles = dict(
+        Service.objects.filter(service_id__in={app.service_type for app in apps}).values_list('service_id', 'title')
+    )
+    return [{
+        'id': str(app.id),
+        'service_name': titles.get(app.service_type, app.service_type),
+        'service_slug': app.service_type if app.service_type in titles else "", # Needed for the link
+        'reference_number': app.reference_number,
+        'status': app.document_status or 'pending',
+        'progress': app.progress,
+        'step_index': app.step_index,
+        'admin_notes': app.admin_notes,
+        'created_at': app.created_at,
+    } for app in apps]
+
 @require_GET
 def my_applications_api(request):
     user = get_authed_user(request)
     if not user:
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=401)
-    
-    # Fetch applications for this user
-    apps = ServiceApplication.objects.filter(user_id=user['id']).order_by('-updated_at')
-    
-    data = []
-    for app in apps:
-        # Get service title safely
-        svc_title = "Unknown Service"
-        svc_slug = ""
-        try:
-            svc = Service.objects.get(service_id=app.service_type)
-            svc_title = svc.title
-            svc_slug = svc.service_id
-        except Service.DoesNotExist:
-            svc_title = app.service_type
-
-        data.append({
-            'id': str(app.id),
-            'service_name': svc_title,
-            'service_slug': svc_slug, # Needed for the link
-            'reference_number': app.reference_number,
-            'status': app.document_status or 'pending',
-            'progress': app.progress,
-            'step_index': app.step_index,
-            'admin_notes': app.admin_notes,
-            'created_at': app.created_at,
-        })
-    
-    return JsonResponse({'success': True, 'applications': data})
\ No newline at end of file
+
+    # Read before the rows so a change made in between is replayed by /api/my-changes/
+    changes_since = latest_event_id()
+    apps = list(ServiceApplication.objects.filter(user_id=user['id']).order_by('-updated_at'))
+    return JsonResponse({'success': True, 'applications': serialize_applications(apps), 'changes_since': changes_since})
+
+def render_user_changes(user_id):
+    """A feed.poll_changes renderer for one citizen: their changed applications and complaints."""
+    def render(events):
+        ids = defaultdict(list)
+        for event in events:
+            if event["action"] != "deleted":
+                ids[event["kind"]].append(event["object_id"])
+        rows = {"complaint": {}, "permit": {}}
+        if ids["complaint"]:
+            complaints = Complaint.objects.filter(pk__in=ids["complaint"], user_id=user_id).values(*COMPLAINT_LIST_FIELDS)
+            rows["complaint"] = {str(c["id"]): c for c in complaints}
+        if ids["permit"]:
+            apps = list(ServiceApplication.objects.filter(pk__in=ids["permit"], user_id=user_id))
+            rows["permit"] = {a["id"]: a for a in serialize_applications(apps)}
+
+        messages = []
+        for event in events:
+            item = rows.get(event["kind"], {}).get(str(event["object_id"]))
+            action = event["action"] if item is not None else "deleted"
+            messages.append((event["kind"], {"action": action, "id": str(event["object_id"]), "item": item}))
+        return messages
+    return render
+
+@require_GET
+def my_changes_view(request):
+    """
+    Changes to the signed-in user's applications and complaints after ?since=
+    (the changes_since of /api/my-applications/ or /complaints/list/), polled
+    by the dashboard while it is visible. See feed_poll_response.
+    """
+    user = get_authed_user(request)
+    if not user or not user.get('id'):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=401)
+
+    after = parse_event_id(request.GET.get('since'))
+    if after is None:
+        return JsonResponse({'success': True, 'changes': [], 'cursor': latest_event_id(), 'more': False})
+    return feed_poll_response(after, render_user_changes(user['id']), user_id=user['id'])
+
+@require_GET
+def my_summary_view(request):
+    """
+    The signed-in user's complaint and application counts by status, for the
+    dashboard header: one row of user_summaries (see summaries.py).
+    """
+    user = get_authed_user(request)
+    if not user or not user.get('id'):
+        return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=401)
+
+    response = JsonResponse({'success': True, **get_user_summary(user['id'])})
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -37,16 +37,34 @@ CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.getenv('CLOUDINARY_CLOUD_NAME', ''),
     'API_KEY': os.getenv('CLOUDINARY_API_KEY', ''),
     'API_SECRET': os.getenv('CLOUDINARY_API_SECRET', ''),
+    # Leave empty in production. Point at `manage.py bench_uploads --serve` to test uploads locally.
+    'UPLOAD_PREFIX': os.getenv('CLOUDINARY_UPLOAD_PREFIX', ''),
 }
 
+# Max concurrent Cloudinary uploads per request (e.g. complaint attachments)
+UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS', '4'))
+
+# Where streamed uploads go: 'cloudinary' (default) or 'local' (dev/tests)
+UPLOAD_STORAGE = os.getenv('UPLOAD_STORAGE', 'cloudinary')
+UPLOAD_LOCAL_ROOT = os.path.join(BASE_DIR, 'uploads')
+UPLOAD_LOCAL_URL = '/uploads/'
+
+# Background workers per process that extract text from uploaded ordinance PDFs
+ORDINANCE_TEXT_WORKERS = int(os.getenv('ORDINANCE_TEXT_WORKERS', '1'))
+
+# Complaint and permit-document submissions accept an Idempotency-Key header;
+# the response is kept in the idempotency_keys table this long so retries replay it.
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', '86400'))
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    # Before staticfiles so its collectstatic (which builds responsive images first) wins
     'mycebu_app',
+    'django.contrib.staticfiles',
     'accounts',
     'reset',
 ]
@@ -101,6 +119,25 @@ DATABASES = {
 
 
 
+# Cache
+# Set REDIS_URL in production so every worker shares cached facets/snapshots and
+# sees invalidations immediately. Without it each process keeps its own copy,
+# and cached entries fall back on their short TTLs.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -138,6 +175,20 @@ USE_TZ = True
 STATIC_URL = '/static/'  
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')] 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles') 
+
+# Resized WebP/AVIF copies of large images, built by `manage.py build_responsive_images`
+# (collectstatic runs it first). Widths are in CSS pixels: 1x/2x/3x of the rendered size.
+RESPONSIVE_IMAGES = {
+    'OUTPUT_DIR': os.path.join(BASE_DIR, 'build', 'responsive'),
+    'FORMATS': ['avif', 'webp'],
+    'SOURCES': {
+        'mycebu_app/images/directory-profiles/*.png': [110, 220, 330],
+        'mycebu_app/images/*.jpg': [640, 1280, 1920],
+        'mycebu_app/images/bg.png': [640, 1280, 1920],
+    },
+}
+if os.path.isdir(RESPONSIVE_IMAGES['OUTPUT_DIR']):
+    STATICFILES_DIRS.append(RESPONSIVE_IMAGES['OUTPUT_DIR'])
 # MEDIA_URL = '/media/'
 # MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # MEDIAFILES_DIRS = [os.path.join(BASE_DIR, 'media')]
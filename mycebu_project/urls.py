@@ -14,6 +14,8 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
 from django.urls import include
@@ -24,3 +26,6 @@ urlpatterns = [
     path('accounts/', include('accounts.urls')),
     path('reset/', include('reset.urls')),
 ]
+
+# Locally stored uploads (UPLOAD_STORAGE = 'local'); static() is a no-op unless DEBUG
+urlpatterns += static(settings.UPLOAD_LOCAL_URL, document_root=settings.UPLOAD_LOCAL_ROOT)
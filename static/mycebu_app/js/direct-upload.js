@@ -0,0 +1,46 @@
+// Signed direct uploads: the file goes from the browser straight to Cloudinary.
+// 1. ask our server for signed fields scoped to one folder
+// 2. POST the file to Cloudinary with them
+// 3. hand Cloudinary's response back to our server, which verifies and records it
+(function () {
+  var SIGN_URL = "/api/uploads/sign/";
+  var CONFIRM_URL = "/api/uploads/confirm/";
+
+  function postJSON(url, body) {
+    return fetch(url, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      credentials: "include",
+      body: JSON.stringify(body)
+    }).then(function (res) { return res.json(); });
+  }
+
+  // scope: { purpose: "permit", service, app_id } or { purpose: "complaint" }
+  // Resolves with the confirm response ({ success, document_url } or { success, attachment }).
+  function directUpload(file, scope) {
+    return postJSON(SIGN_URL, scope).then(function (signed) {
+      if (!signed.success) throw new Error(signed.error || "Could not prepare upload");
+
+      var fd = new FormData();
+      Object.keys(signed.fields).forEach(function (k) { fd.append(k, signed.fields[k]); });
+      fd.append("file", file);
+
+      return fetch(signed.upload_url, { method: "POST", body: fd })
+        .then(function (res) { return res.json(); })
+        .then(function (result) {
+          if (!result.secure_url) throw new Error((result.error && result.error.message) || "Upload failed");
+          return postJSON(CONFIRM_URL, {
+            token: signed.token,
+            result: result,
+            name: file.name,
+            content_type: file.type
+          });
+        });
+    }).then(function (confirmed) {
+      if (!confirmed.success) throw new Error(confirmed.error || "Upload could not be verified");
+      return confirmed;
+    });
+  }
+
+  window.MyCebuUpload = { directUpload: directUpload };
+})();